@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from html_parsing import BACKENDS, available_backends, parse_history_urls, parse_product_fields
+
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+DEFAULT_PAGES = [
+    ('product', os.path.join(FIXTURES, 'product_page.html')),
+    ('history', os.path.join(FIXTURES, 'order_history.html')),
+]
+
+
+def parse(kind, content, backend):
+    if kind == 'history':
+        return parse_history_urls(content, backend)
+    return parse_product_fields(content, backend)
+
+
+def measure(backend, pages, repeat):
+    # Runs inside a fresh interpreter per backend so peak RSS is not shared between backends.
+    # RSS growth covers C-level trees (lxml, lexbor) that tracemalloc cannot see.
+    results = []
+    for kind, path in pages:
+        with open(path, 'rb') as f:
+            content = f.read()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        parse(kind, content, backend)  # warm-up (lazy imports, regex compilation)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(kind, content, backend)
+            timings.append(time.perf_counter() - start)
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        tracemalloc.start()
+        parse(kind, content, backend)
+        _, py_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results.append({
+            'backend': backend,
+            'page': os.path.basename(path),
+            'kind': kind,
+            'bytes': len(content),
+            'median_ms': statistics.median(timings) * 1000,
+            'min_ms': min(timings) * 1000,
+            'py_peak_kb': py_peak / 1024,
+            'rss_growth_kb': max(0, rss_after - rss_before),
+        })
+    return results
+
+
+def check_consistency(pages, backends):
+    # Every backend must extract exactly what the reference html.parser backend extracts
+    problems = []
+    for kind, path in pages:
+        with open(path, 'rb') as f:
+            content = f.read()
+        expected = parse(kind, content, 'html.parser')
+        for backend in backends:
+            if parse(kind, content, backend) != expected:
+                problems.append(f"{backend} differs from html.parser on {os.path.basename(path)}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTML parser backends on saved pages.')
+    parser.add_argument('pages', nargs='*', help='Extra pages to time, as product:PATH or history:PATH (default: bundled fixtures)')
+    parser.add_argument('--backend', action='append', dest='backends', help=f'Backend to compare; repeat for several (default: all installed of {", ".join(BACKENDS)})')
+    parser.add_argument('--repeat', type=int, default=20, help='Parses per page (default: 20)')
+    parser.add_argument('--json', help='Also write results to this JSON file')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    pages = DEFAULT_PAGES + [tuple(p.split(':', 1)) for p in args.pages]
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, pages, args.repeat)))
+        return
+
+    backends = args.backends or available_backends()
+    problems = check_consistency(pages, backends)
+    for problem in problems:
+        print(f"WARNING: {problem}")
+
+    results = []
+    for backend in backends:
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker', backend, '--repeat', str(args.repeat)] + args.pages
+        output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        results.extend(json.loads(output))
+
+    print(f"{'page':<22} {'backend':<12} {'median ms':>10} {'min ms':>8} {'py peak KB':>11} {'RSS +KB':>8}")
+    for r in sorted(results, key=lambda r: (r['page'], r['median_ms'])):
+        print(f"{r['page']:<22} {r['backend']:<12} {r['median_ms']:>10.2f} {r['min_ms']:>8.2f} {r['py_peak_kb']:>11.0f} {r['rss_growth_kb']:>8}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
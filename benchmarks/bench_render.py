@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from bench_transform import synthetic_catalog
+from generate_garden_data import LFD, create_anchor, group_varieties, load_catalog, render_crop_page, write_crop_page
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time crop page rendering per 1k varieties.')
+    parser.add_argument('--rows', type=int, default=10_000, help='Synthetic catalog size (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the best is reported (default: 3)')
+    args = parser.parse_args()
+
+    df = synthetic_catalog(args.rows)
+    grouped, _ = group_varieties(load_catalog(df), LFD)
+    varieties = sum(len(items) for items in grouped.values())
+    print(f"Synthetic catalog: {varieties} varieties in {len(grouped)} crop pages")
+
+    def render_all():
+        for crop, items in grouped.items():
+            render_crop_page(crop, items)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        def stream_all():
+            for crop, items in grouped.items():
+                write_crop_page(os.path.join(out_dir, f"{create_anchor(crop)}.html"), crop, items)
+
+        results = [
+            ('render to str', min(timed(render_all) for _ in range(args.repeat))),
+            # The first run writes every page; later runs find identical files and leave them alone
+            ('stream, new files', timed(stream_all)),
+            ('stream, unchanged', min(timed(stream_all) for _ in range(args.repeat))),
+        ]
+        size = sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir))
+
+    for label, seconds in results:
+        print(f"{label:<18} {seconds:8.3f}s  ({seconds / varieties * 1000 * 1000:.1f} ms per 1k varieties)")
+    print(f"output: {size / 1024:.0f} KB ({size / varieties:.0f} bytes per variety)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from bench_transform import synthetic_catalog
+import generate_garden_data as gen
+import growing_info
+from html_parsing import parse_history_urls, parse_product_fields
+
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+GENERATE_SCRIPT = os.path.join(ROOT, 'scripts', 'generate_garden_data.py')
+DEFAULT_SIZES = [1000, 10_000, 100_000]
+# Modules whose import time counts as startup, measured in a fresh interpreter
+STARTUP_MODULES = ["generate_garden_data", "scrape_johnnys_seeds"]
+# Dependencies the CLI scripts only import once they need them
+HEAVY_MODULES = ("pandas", "numpy", "bs4", "PIL")
+# Phrases in the shape of the vendor's Growing Info sections, combined at random so a large
+# catalog has thousands of distinct blobs (vendors reuse one blob for several varieties)
+CULTURE = [
+    "Prefers fertile, well-drained soil with a pH of {ph}.",
+    "Grows best in cool weather; bolts in heat.",
+    "Requires a sunny site and consistent moisture.",
+    "Sow {depth}\" deep, {spacing} seeds per foot, in rows {rows}\" apart.",
+    "Thin to {spacing}\" apart when seedlings have 2 true leaves.",
+]
+TRANSPLANTING = [
+    "Sow {weeks_min}-{weeks_max} weeks before transplanting outdoors.",
+    "Sow {weeks_min}–{weeks_max} weeks before last frost. Harden off before transplanting.",
+    "Transplant (recommended) | Sow indoors {weeks_min} weeks before planting out.",
+    "Start indoors in plug flats {weeks_min} weeks before setting out.",
+]
+DIRECT = [
+    "Direct seed (recommended) | Sow after danger of frost.",
+    "DIRECT SEEDING: | Sow {depth}\" deep when soil has warmed to {temp}°F.",
+]
+PESTS = [
+    "Flea beetles, aphids and cucumber beetles.", "Japanese beetles; use row cover.",
+    "Alternaria leaf blight and powdery mildew.", "Prevent damping off with good air flow.",
+]
+HARVEST = [
+    "Pick regularly to encourage production.", "Harvest at {dtm} days when fully colored.",
+    "Cut at the base when heads are firm.", "Cure in a warm, dry place for {weeks_min} weeks.",
+]
+STORAGE = ["Store at 32°F and 95% relative humidity.", "Keeps {weeks_max} weeks refrigerated."]
+
+
+def growing_info_blob(rng):
+    values = {
+        "ph": f"{rng.uniform(5.8, 7.2):.1f}", "depth": rng.choice(["1/4", "1/2", "1"]), "spacing": rng.randint(2, 18),
+        "rows": rng.randint(12, 36), "weeks_min": rng.randint(2, 8), "temp": rng.randint(50, 70), "dtm": rng.randint(45, 120),
+    }
+    values["weeks_max"] = values["weeks_min"] + rng.randint(1, 4)
+    sections = ["CULTURE:", *rng.sample(CULTURE, rng.randint(1, 3))]
+    if rng.random() < 0.5:
+        sections += ["TRANSPLANTING:", rng.choice(TRANSPLANTING)]
+    else:
+        sections.append(rng.choice(DIRECT))
+    if rng.random() < 0.7:
+        sections += ["INSECT PESTS AND DISEASE:", *rng.sample(PESTS, rng.randint(1, 2))]
+    sections += ["HARVEST:", rng.choice(HARVEST)]
+    if rng.random() < 0.3:
+        sections += ["STORAGE:", rng.choice(STORAGE)]
+    return " | ".join(sections).format(**values)
+
+
+def catalog(rows, seed=0):
+    # synthetic_catalog() with realistic Growing Info: about one distinct blob per 4 rows
+    rng = random.Random(seed)
+    df = synthetic_catalog(rows, seed)
+    blobs = [growing_info_blob(rng) for _ in range(max(1, rows // 4))]
+    df['Growing Info'] = [rng.choice(blobs) if rng.random() > 0.02 else None for _ in range(rows)]
+    return df
+
+
+def clear_caches():
+    growing_info.clear_cache()
+    for fn in (gen.readable_growing_text, gen.format_day, gen.date_window):
+        fn.cache_clear()
+
+
+def best_of(repeat, fn, *args):
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def tree_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def bench_fixtures(results, repeat):
+    with open(os.path.join(FIXTURES, 'order_history.html'), 'rb') as f:
+        history = f.read()
+    with open(os.path.join(FIXTURES, 'product_page.html'), 'rb') as f:
+        product = f.read()
+    parse_history_urls(history)  # warm-up (lazy imports, regex compilation)
+    results["fixtures/history_urls.seconds"] = best_of(repeat, parse_history_urls, history)
+    results["fixtures/product_parse.seconds"] = best_of(repeat, parse_product_fields, product)
+
+
+def import_times(module):
+    # {module: cumulative seconds} from `python -X importtime -c "import <module>"`
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=os.path.join(ROOT, 'scripts'),
+                            check=True, capture_output=True, text=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if line.startswith('import time:') and not line.endswith('imported package'):
+            _, cumulative, name = line[len('import time:'):].split('|')
+            times.setdefault(name.strip(), int(cumulative) / 1e6)
+    return times
+
+
+def bench_startup(results, repeat):
+    # Import time of each CLI script, and how many heavy dependencies it imports up front
+    for module in STARTUP_MODULES:
+        runs = [import_times(module) for _ in range(repeat)]
+        results[f"startup/{module}.seconds"] = min(times[module] for times in runs)
+        results[f"startup/{module}.heavy_imports"] = sum(name in runs[0] for name in HEAVY_MODULES)
+
+
+def bench_catalog(results, rows, repeat, work_dir):
+    df = catalog(rows)
+    texts = [text for text in df['Growing Info'].drop_duplicates() if isinstance(text, str)]
+    sample = df.head(10_000)
+    key = f"{rows}"
+
+    results[f"{key}/parse_growing_info.seconds"] = best_of(repeat, lambda: [gen.parse_growing_info(t) for t in texts])
+    crops = [gen.identify_crop_type(name) for name in sample['Product Name']]
+    results[f"{key}/calculate_dates.seconds"] = best_of(
+        repeat, lambda: [gen.calculate_dates(c, t) for c, t in zip(crops, sample['Growing Info'])])
+    results[f"{key}/transform_catalog.seconds"] = best_of(repeat, gen.transform_catalog, df)
+
+    # Full generation in a fresh interpreter, as a user runs it: a clean build, then a rebuild
+    # with nothing changed
+    site_dir = os.path.join(work_dir, key)
+    os.makedirs(site_dir)
+    csv_path = os.path.join(site_dir, 'catalog.csv')
+    df.to_csv(csv_path, index=False)
+    for label in ("generate", "regenerate"):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, GENERATE_SCRIPT, csv_path], cwd=site_dir, check=True, stdout=subprocess.DEVNULL)
+        results[f"{key}/{label}.seconds"] = time.perf_counter() - start
+    results[f"{key}/plants.bytes"] = tree_size(os.path.join(site_dir, 'site', 'plants'))
+    results[f"{key}/schedule.bytes"] = (tree_size(os.path.join(site_dir, 'site', 'schedule'))
+                                        + os.path.getsize(os.path.join(site_dir, 'site', 'schedule.html')))
+    results[f"{key}/data.bytes"] = tree_size(os.path.join(site_dir, 'data'))
+
+
+def compare(results, baseline, tolerance, size_tolerance):
+    # Returns the keys that regressed: timings more than `tolerance` slower, sizes and counts
+    # more than `size_tolerance` larger than the baseline, and metrics the baseline lacks
+    # (a new metric is unchecked until the baseline is re-recorded)
+    regressions = []
+    print(f"\n{'metric':<38} {'baseline':>12} {'current':>12} {'change':>8}")
+    for key, value in results.items():
+        before = baseline.get(key)
+        if before is None:
+            regressions.append(key)
+            print(f"{key:<38} {'-':>12} {_format(key, value):>12} {'':>8}  MISSING BASELINE")
+            continue
+        change = value / before - 1 if before else (float('inf') if value else 0.0)
+        limit = tolerance if key.endswith('.seconds') else size_tolerance
+        flag = "  REGRESSION" if change > limit else ""
+        if flag:
+            regressions.append(key)
+        print(f"{key:<38} {_format(key, before):>12} {_format(key, value):>12} {change:>+7.0%}{flag}")
+    return regressions
+
+
+def _format(key, value):
+    if key.endswith('.bytes'):
+        return f"{value / 1024:.0f} KB"
+    if not key.endswith('.seconds'):
+        return str(value)
+    return f"{value * 1000:.1f} ms" if value < 1 else f"{value:.2f} s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite: script startup, fixture parsing, catalog transforms and full site generation, compared against a stored baseline.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Synthetic catalog sizes (default: 1000 10000 100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per in-process measurement; the best is kept (default: 3)')
+    parser.add_argument('--baseline', default=BASELINE, help='Baseline file (default: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='Record this run as the new baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before a timing counts as a regression (default: 0.25)')
+    parser.add_argument('--size-tolerance', type=float, default=0.02, help='Allowed growth before an output size counts as a regression (default: 0.02)')
+    parser.add_argument('--output', help='Also write this run\'s results to a JSON file')
+    parser.add_argument('--write-catalog', metavar='CSV', help='Only write a synthetic catalog of the first --sizes size to CSV and exit')
+    args = parser.parse_args()
+
+    if args.write_catalog:
+        catalog(args.sizes[0]).to_csv(args.write_catalog, index=False)
+        print(f"Wrote {args.sizes[0]} rows to {args.write_catalog}")
+        return
+
+    machine = {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+    results = {}
+    bench_startup(results, args.repeat)
+    bench_fixtures(results, args.repeat)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.sizes:
+            print(f"Benchmarking a {rows}-row catalog...")
+            bench_catalog(results, rows, args.repeat, work_dir)
+
+    run = {"machine": machine, "results": results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=1)
+        for key, value in results.items():
+            print(f"{key:<38} {_format(key, value):>12}")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except OSError:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        baseline = {"results": {}}
+    if baseline.get("machine") and baseline["machine"] != machine:
+        print(f"Note: the baseline was recorded on {baseline['machine']}; timings may not be comparable")
+    regressions = compare(results, baseline["results"], args.tolerance, args.size_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if any(key not in baseline["results"] for key in regressions):
+            print("Metrics missing from the baseline: re-record it with --save-baseline")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from generate_garden_data import (CROP_KEYWORDS, DTM_RE, calculate_dates, create_anchor,
+                                  identify_crop_type, transform_catalog)
+
+GROWING_INFO = [
+    "CULTURE: | Prefers fertile, well-drained soil. | Direct seed (recommended) | HARVEST: | Pick regularly.",
+    "CULTURE: | Grows best in cool weather. | TRANSPLANTING: | Sow 3–4 weeks before transplanting outdoors. | HARVEST: | Cut at base.",
+    "TRANSPLANTING: | Sow 6-8 weeks before transplanting. | INSECT PESTS AND DISEASE: | Flea beetles, aphids. | HARVEST: | Pick when fully colored.",
+    "CULTURE: | Transplant (recommended) | Sow 4 weeks before last frost. | PESTS: | Japanese beetles.",
+    "CULTURE: | Direct seed (recommended) | Loose soil. | DISEASE: | Alternaria leaf blight.",
+    "SCIENTIFIC NAME: | Unknown | SEEDS/OZ. (AVG.): | 8,750 | PACKET: | 200 seeds.",
+    None,
+]
+ADJECTIVES = ["Organic", "Early", "Giant", "Sweet", "Red", "Golden", "Dwarf", "Heirloom", "(F1)", "Pelleted"]
+DTMS = ["57", "68", "75-90", "110", None, "45 Days", "From transplant: 70"]
+
+
+def synthetic_catalog(rows, seed=0):
+    rng = random.Random(seed)
+    keywords = [k for k, *_ in CROP_KEYWORDS] + ["mystery", "sorrel"]
+    records = []
+    for i in range(rows):
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} {rng.choice(keywords).title()} {i}"
+        records.append({
+            'Product Name': name,
+            'Latin Name': 'Plantae sp.',
+            'Days to Maturity': rng.choice(DTMS),
+            'Life Cycle': 'Annual',
+            'Hybrid Status': rng.choice(['Hybrid', 'Open Pollinated']),
+            'Disease Resistance': 'N/A',
+            'Growing Info': rng.choice(GROWING_INFO),
+            'URL': f"https://example.com/p/{i}.html",
+            'Image Path': 'N/A',
+        })
+    return pd.DataFrame(records)
+
+
+def row_loop(df):
+    # The original per-row path
+    out = []
+    for _, row in df.iterrows():
+        name = row['Product Name']
+        if not isinstance(name, str):
+            continue
+        crop = identify_crop_type(name)
+        dates = calculate_dates(crop, row['Growing Info'])
+        match = DTM_RE.search(str(row['Days to Maturity']))
+        out.append((crop, create_anchor(name), int(match.group(1)) if match else 999, dates['method'],
+                    dates['start_range'], dates['transplant_range'], dates['start_date_obj'], dates['transplant_date_obj']))
+    return out
+
+
+def vectorized(df):
+    catalog = transform_catalog(df)
+    return list(catalog[['crop', 'anchor', 'sort_dtm', 'method', 'start_range', 'transplant_range',
+                         'start_date', 'transplant_date']].itertuples(index=False, name=None))
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the row-by-row and vectorized catalog transforms.')
+    parser.add_argument('--rows', type=int, default=100_000, help='Synthetic catalog size (default: 100000)')
+    parser.add_argument('--skip-loop', action='store_true', help='Only time the vectorized path')
+    args = parser.parse_args()
+
+    df = synthetic_catalog(args.rows)
+    print(f"Synthetic catalog: {len(df)} rows")
+
+    fast, fast_time = timed(vectorized, df)
+    print(f"vectorized: {fast_time:8.3f}s  ({fast_time / len(df) * 1e6:.1f} us/row)")
+
+    if not args.skip_loop:
+        slow, slow_time = timed(row_loop, df)
+        print(f"iterrows:   {slow_time:8.3f}s  ({slow_time / len(df) * 1e6:.1f} us/row)")
+        print(f"speedup:    {slow_time / fast_time:8.1f}x")
+        if [tuple(r) for r in slow] != [tuple(r) for r in fast]:
+            print("ERROR: vectorized output differs from the row-by-row path")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
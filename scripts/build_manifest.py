@@ -0,0 +1,114 @@
+import filecmp
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def content_hash(*parts):
+    # Stable hash of JSON-able values; dates and NaN fall back to their string form
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def atomic_write(path, data):
+    # Write to a temp file in the same directory and rename over the target, so readers
+    # (browsers, rsync) never see a half-written file
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_if_changed(path, content):
+    # Returns True if the file was (re)written. Unchanged files keep their mtime.
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    atomic_write(path, data)
+    return True
+
+
+def compressed_variants(path):
+    # Precompressed siblings served by e.g. nginx gzip_static/brotli_static
+    return [f"{path}.gz"] + ([f"{path}.br"] if brotli is not None else [])
+
+
+def write_precompressed(path, content, level=9):
+    # write_if_changed plus .gz (and .br when brotli is installed) next to the file.
+    # Compression is skipped when the file is unchanged and its variants exist. `level` is
+    # the gzip level.
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    changed = write_if_changed(path, data)
+    for variant in compressed_variants(path):
+        if changed or not os.path.exists(variant):
+            if variant.endswith('.gz'):
+                atomic_write(variant, gzip.compress(data, compresslevel=level, mtime=0))
+            else:
+                atomic_write(variant, brotli.compress(data))
+    return changed
+
+
+def stream_if_changed(path, produce, buffering=1 << 16):
+    # Like write_if_changed for content that is produced in pieces: produce(write) streams
+    # text into a buffered temp file, which replaces the target only if it differs
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='', buffering=buffering) as f:
+        produce(f.write)
+    if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+class BuildManifest:
+    # Maps each output file to the hash of the inputs it was last built from
+    def __init__(self, path):
+        self.path = path
+        self.outputs = {}
+        self._seen = set()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.outputs = json.load(f).get('outputs', {})
+            except (OSError, ValueError):
+                self.outputs = {}
+
+    def is_current(self, output_path, inputs_hash):
+        self._seen.add(output_path)
+        return self.outputs.get(output_path) == inputs_hash and os.path.exists(output_path)
+
+    def record(self, output_path, inputs_hash):
+        self._seen.add(output_path)
+        self.outputs[output_path] = inputs_hash
+
+    def stale_outputs(self):
+        # Outputs from a previous build that this build did not produce
+        return [path for path in self.outputs if path not in self._seen]
+
+    def forget(self, output_path):
+        self.outputs.pop(output_path, None)
+
+    def save(self):
+        data = json.dumps({'outputs': self.outputs}, indent=2, sort_keys=True)
+        write_if_changed(self.path, data)
@@ -0,0 +1,96 @@
+import functools
+import json
+import re
+
+
+def _trie_pattern(keywords):
+    # Regex shaped like a trie of the keywords, e.g. "pe(?:a|pper)". At any position at most one
+    # branch can continue, and optional tails are greedy, so it yields the longest keyword
+    # starting there in a single left-to-right walk.
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class CropClassifier:
+    # Maps product names to crop types from a keyword -> crop table. When several keywords
+    # occur in one name, the one with the lowest priority number wins, regardless of where it
+    # occurs or of table order.
+    def __init__(self, entries=(), default="Other", cache_size=65536):
+        self.default = default
+        self._entries = {}
+        self._cache_size = cache_size
+        for keyword, crop, priority in entries:
+            self._entries[keyword.lower()] = (priority, crop)
+        self._compile()
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        classifier = cls(**kwargs)
+        classifier.load(path)
+        return classifier
+
+    def add(self, keyword, crop, priority=None):
+        # Without an explicit priority the keyword ranks after everything already in the table
+        if priority is None:
+            priority = max((p for p, _ in self._entries.values()), default=0) + 10
+        self._entries[keyword.lower()] = (priority, crop)
+        self._compile()
+
+    def load(self, path):
+        # JSON table: {"keywords": [{"keyword": "ground cherry", "crop": "Tomatillo", "priority": 5}, ...]}
+        # Returns the whole document so callers can read extra sections (e.g. crop defaults).
+        with open(path, 'r', encoding='utf-8') as f:
+            table = json.load(f)
+        for entry in table.get("keywords", []):
+            priority = entry.get("priority")
+            if priority is None:
+                priority = max((p for p, _ in self._entries.values()), default=0) + 10
+            self._entries[entry["keyword"].lower()] = (priority, entry["crop"])
+        self._compile()
+        return table
+
+    def entries(self):
+        return sorted(((k, crop, p) for k, (p, crop) in self._entries.items()), key=lambda e: (e[2], e[0]))
+
+    def crops(self):
+        return sorted({crop for _, crop in self._entries.values()})
+
+    def _compile(self):
+        keywords = list(self._entries)
+        # Every keyword that is a prefix of a longer one also matches wherever the longer one
+        # does, so precompute the best (priority, crop) over each keyword's prefixes
+        self._best = {}
+        for keyword in keywords:
+            candidates = [self._entries[k] for k in keywords if keyword.startswith(k)]
+            self._best[keyword] = min(candidates)
+        pattern = _trie_pattern(keywords) if keywords else r'(?!x)x'
+        self._regex = re.compile(f"(?=({pattern}))")
+        self.classify = functools.lru_cache(maxsize=self._cache_size)(self._classify)
+
+    def _classify(self, name):
+        if not isinstance(name, str):
+            return self.default
+        best = None
+        for match in self._regex.finditer(name.lower()):
+            found = match.group(1)
+            if found:
+                candidate = self._best[found]
+                if best is None or candidate < best:
+                    best = candidate
+        return best[1] if best else self.default
@@ -1,13 +1,71 @@
-import requests
-import sys
+import argparse
+import json
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def download_image(search_term, output_filename):
-    print(f"Searching for '{search_term}'...")
-    url = "https://commons.wikimedia.org/w/api.php"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
+from build_manifest import atomic_write
+from http_client import HttpClient, RateLimiter, get_default_client
+from page_cache import DAY
+
+API_URL = "https://commons.wikimedia.org/w/api.php"
+SEARCH_CACHE = "data/cache/wiki_search.json"
+VALID_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif']
+# Leading bytes of the formats we download; anything else at an output path is re-fetched
+IMAGE_SIGNATURES = (b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF87a', b'GIF89a')
+
+
+class SearchCache:
+    # Image URLs found for each search term, kept on disk between runs so refreshing a batch
+    # does not repeat API queries. Entries older than `ttl` seconds are searched again.
+    def __init__(self, path=SEARCH_CACHE, ttl=30 * DAY):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._changed = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, api_url, search_term):
+        with self._lock:
+            entry = self._entries.get(f"{api_url} {search_term}")
+            if entry is None or time.time() - entry["searched_at"] > self.ttl:
+                return None
+            self.hits += 1
+            return entry["urls"]
+
+    def put(self, api_url, search_term, urls):
+        with self._lock:
+            self._entries[f"{api_url} {search_term}"] = {"urls": urls, "searched_at": time.time()}
+            self._changed = True
+
+    def save(self):
+        with self._lock:
+            if self._changed:
+                atomic_write(self.path, json.dumps(self._entries, indent=1, sort_keys=True).encode('utf-8'))
+                self._changed = False
+
+
+def is_valid_image(path):
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(8)
+    except OSError:
+        return False
+    return head.startswith(IMAGE_SIGNATURES)
+
+
+def search_image_urls(search_term, client, api_url=API_URL, cache=None):
+    # Image URLs of the top File: namespace results, in search order
+    urls = cache.get(api_url, search_term) if cache else None
+    if urls is not None:
+        return urls
     params = {
         "action": "query",
         "generator": "search",
@@ -18,51 +76,115 @@ def download_image(search_term, output_filename):
         "format": "json",
         "gsrlimit": 5  # Get top 5 to check for valid extensions
     }
+    response = client.get(api_url, params=params)
+    response.raise_for_status()
+    pages = response.json().get("query", {}).get("pages", {})
+    # Page ids are not in search order; "index" is
+    ordered = sorted(pages.values(), key=lambda page: page.get("index", 0))
+    urls = [page["imageinfo"][0]["url"] for page in ordered if page.get("imageinfo")]
+    if cache:
+        cache.put(api_url, search_term, urls)
+    return urls
 
-    try:
-        response = requests.get(url, params=params, headers=headers)
-        data = response.json()
-        
-        pages = data.get("query", {}).get("pages", {})
-        if not pages:
-            print(f"No images found for {search_term}")
-            return
 
+def download_image(search_term, output_filename, client=None, cache=None, api_url=API_URL, force=False):
+    # Returns "skipped", "downloaded", "not found" or "failed"
+    if not force and is_valid_image(output_filename):
+        return "skipped"
+    print(f"Searching for '{search_term}'...")
+    client = client or get_default_client()
+
+    try:
         image_url = None
-        for page_id, page in pages.items():
-            image_info = page.get("imageinfo", [])
-            if not image_info:
-                continue
-            
-            temp_url = image_info[0]["url"]
+        for temp_url in search_image_urls(search_term, client, api_url, cache):
             ext = temp_url.lower().split('.')[-1]
-            if ext in ['jpg', 'jpeg', 'png', 'gif']:
+            if ext in VALID_EXTENSIONS:
                 image_url = temp_url
                 print(f"Found valid image: {image_url}")
                 break
-        
+
         if not image_url:
             print(f"No valid jpg/png images found for {search_term}")
-            return
+            return "not found"
 
         print(f"Downloading from {image_url}...")
-        
-        img_response = requests.get(image_url, headers=headers)
-        if img_response.status_code == 200:
-            with open(output_filename, "wb") as f:
-                f.write(img_response.content)
+        directory = os.path.dirname(output_filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        status = client.download(image_url, output_filename, chunk_size=256 * 1024)
+        if status == 200:
             print(f"Saved to {output_filename}")
-        else:
-            print(f"Failed to download image. Status code: {img_response.status_code}")
+            return "downloaded"
+        print(f"Failed to download image. Status code: {status}")
+        return "failed"
 
     except Exception as e:
         print(f"Error: {e}")
+        return "failed"
 
-if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python download_wiki_images.py <search_term> <output_path>")
+
+def load_batch(path):
+    # JSON: {"images": [{"search": "Tomato plant", "output": "site/images/wiki/tomato.jpg"}, ...]}
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f).get("images", [])
+    return [(entry["search"], entry["output"]) for entry in entries]
+
+
+def download_batch(jobs, client, cache=None, api_url=API_URL, workers=4, force=False):
+    # Searches and downloads run `workers` at a time; the client's rate limiter keeps each host
+    # within its limit. Returns {output path: result}; a path listed twice uses its last entry.
+    jobs = list({output: (search_term, output) for search_term, output in jobs}.values())
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = executor.map(lambda job: download_image(*job, client, cache, api_url, force), jobs)
+        return dict(zip((output for _, output in jobs), results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download images from Wikimedia Commons by search term.')
+    parser.add_argument('search_term', nargs='?', help='Search term for a single image')
+    parser.add_argument('output_path', nargs='?', help='Where to save the single image')
+    parser.add_argument('--batch', help='JSON manifest of {"search", "output"} pairs to download in one run')
+    parser.add_argument('--workers', type=int, default=4, help='Images searched and downloaded concurrently (default: 4)')
+    parser.add_argument('--rate', type=float, default=2, help='Requests per second allowed per host (default: 2)')
+    parser.add_argument('--burst', type=int, default=4, help='Requests allowed back-to-back per host before rate limiting (default: 4)')
+    parser.add_argument('--force', action='store_true', help='Download again even if the output already holds a valid image')
+    parser.add_argument('--api-url', default=API_URL, help=f'MediaWiki API endpoint (default: {API_URL})')
+    parser.add_argument('--search-cache', default=SEARCH_CACHE, help=f'File caching search results between runs (default: {SEARCH_CACHE})')
+    parser.add_argument('--cache-ttl', type=float, default=30, help='Days before a cached search is repeated (default: 30)')
+    parser.add_argument('--no-cache', action='store_true', help='Always query the API')
+    args = parser.parse_args()
+
+    if args.batch:
+        try:
+            jobs = load_batch(args.batch)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error: Could not load batch from '{args.batch}': {e}")
+            sys.exit(1)
+    elif args.search_term and args.output_path:
+        jobs = [(args.search_term, args.output_path)]
+    else:
+        parser.print_usage()
+        sys.exit(1)
+
+    client = HttpClient(pool_size=max(1, args.workers) * 2, limiter=RateLimiter(rate=args.rate, burst=args.burst))
+    cache = None if args.no_cache else SearchCache(args.search_cache, ttl=args.cache_ttl * DAY)
+    try:
+        results = download_batch(jobs, client, cache, args.api_url, args.workers, args.force)
+    finally:
+        if cache:
+            cache.save()
+        client.close()
+
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    print(f"\n{len(results)} images: " + ", ".join(f"{counts.get(key, 0)} {key}" for key in ("downloaded", "skipped", "not found", "failed")))
+    for output, result in results.items():
+        if result in ("not found", "failed"):
+            print(f"  {result}: {output}")
+    print(f"HTTP: {client.stats.summary()}" + (f"; {cache.hits} cached searches" if cache else ""))
+    if counts.get("failed"):
         sys.exit(1)
-    
-    search_term = sys.argv[1]
-    output_path = sys.argv[2]
-    download_image(search_term, output_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+# Event bits from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# struct inotify_event: wd, mask, cookie, len, then a NUL-padded name of len bytes
+EVENT = struct.Struct('iIII')
+# Editors and atomic writers touch these next to the real files
+IGNORED_SUFFIXES = ('.tmp', '.swp', '.swx', '~')
+
+
+def _load_inotify():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    # Reports changes to single files and to directory trees. Uses inotify through ctypes on
+    # Linux, and polls modification times everywhere else (or with polling=True). A watched
+    # file counts as changed when it or a sibling named "<file>-<suffix>" (SQLite's -wal and
+    # -journal) is written, created, renamed over or deleted.
+    def __init__(self, polling=False, poll_interval=0.5):
+        self.files = set()
+        self.trees = {}
+        self.poll_interval = poll_interval
+        self._libc = None if polling else _load_inotify()
+        self._fd = None
+        self._dirs = {}
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+        self._snapshot = None
+
+    @property
+    def mode(self):
+        return "inotify" if self._fd is not None else "polling"
+
+    def watch_file(self, path):
+        path = os.path.abspath(path)
+        self.files.add(path)
+        self._add_watch(os.path.dirname(path))
+
+    def watch_tree(self, path, suffixes=None):
+        # Every file under `path` (optionally only names ending with one of `suffixes`),
+        # including directories created later
+        path = os.path.abspath(path)
+        self.trees[path] = tuple(suffixes) if suffixes else None
+        for root, dirs, _ in os.walk(path):
+            self._add_watch(root)
+
+    def _add_watch(self, directory):
+        if self._fd is None:
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            # Usually the per-user watch limit; polling still sees everything
+            print(f"Could not watch {directory} with inotify ({os.strerror(ctypes.get_errno())}); polling instead")
+            os.close(self._fd)
+            self._fd = None
+            return
+        self._dirs[wd] = directory
+
+    def _relevant(self, path):
+        # The watched path that `path` belongs to, or None
+        if path.endswith(IGNORED_SUFFIXES):
+            return None
+        for file in self.files:
+            if path == file or path.startswith(file + '-'):
+                return file
+        for tree, suffixes in self.trees.items():
+            if path.startswith(tree + os.sep) and (suffixes is None or path.endswith(suffixes)):
+                return path
+        return None
+
+    def wait(self, timeout=None):
+        # Changed paths, or an empty set if nothing changed within `timeout` seconds
+        if self._fd is None:
+            return self._poll(timeout)
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0')
+            offset += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: assume everything changed
+                return set(self.files) | set(self.trees)
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and any(path.startswith(tree + os.sep) for tree in self.trees):
+                    for root, dirs, _ in os.walk(path):
+                        self._add_watch(root)
+                continue
+            target = self._relevant(path)
+            if target is not None:
+                changed.add(target)
+        return changed
+
+    def _stat_all(self):
+        snapshot = {}
+        candidates = []
+        for file in self.files:
+            directory, base = os.path.split(file)
+            try:
+                candidates += [os.path.join(directory, name) for name in os.listdir(directory)
+                               if name == base or name.startswith(base + '-')]
+            except OSError:
+                pass
+        for tree in self.trees:
+            for root, _, names in os.walk(tree):
+                candidates += [os.path.join(root, name) for name in names]
+        for path in candidates:
+            if self._relevant(path) is None:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _poll(self, timeout):
+        if self._snapshot is None:
+            self._snapshot = self._stat_all()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.poll_interval if deadline is None else min(self.poll_interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+            snapshot = self._stat_all()
+            changed = {self._relevant(path) for path in snapshot.keys() ^ self._snapshot.keys()}
+            changed.update(self._relevant(path) for path, stamp in snapshot.items() if self._snapshot.get(path, stamp) != stamp)
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def changes(self, debounce=0.3, max_wait=5.0):
+        # Blocks until something changes, then keeps collecting until nothing has changed for
+        # `debounce` seconds (but at most `max_wait`), so a burst of writes is reported once
+        changed = set()
+        while not changed:
+            changed = self.wait()
+        settle_by = time.monotonic() + max_wait
+        while time.monotonic() < settle_by:
+            more = self.wait(min(debounce, max(0.0, settle_by - time.monotonic())))
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,201 @@
+import functools
+import html
+import re
+
+SECTIONS = ("culture", "transplanting", "pests", "harvest")
+NO_INFO = "No growing info available."
+
+# Header fragment -> (section, shown in bold). Main headers start a section silently; sub-headers
+# (e.g. "TRELLISING:") are kept in bold inside the section they belong to. Headers mapped to
+# None end the current section; unknown headers are classified by _header_section.
+HEADERS = {
+    "CULTURE:": ("culture", False),
+    "TRANSPLANTING:": ("transplanting", False),
+    "HARVEST:": ("harvest", False),
+    "INSECT PESTS AND DISEASE:": ("pests", False),
+    "DISEASE:": ("pests", False),
+    "PESTS:": ("pests", False),
+    "INSECT PESTS:": ("pests", False),
+    "SCIENTIFIC NAME:": None,
+    "DAYS TO MATURITY:": None,
+    "TRANSPLANTS:": None,
+    "SEEDS/OZ. (AVG.):": None,
+    "PACKET:": None,
+}
+# Substring rules for headers not in the table, first match wins
+HEADER_RULES = [
+    (("CULTURE",), "culture"),
+    (("TRANSPLANTING",), "transplanting"),
+    (("PEST", "DISEASE"), "pests"),
+    (("HARVEST", "STORAGE"), "harvest"),
+    (("TRELLIS", "PRUNING", "DETERMINATE"), "culture"),
+]
+TEXT = "text"
+
+TRANSPLANT_INFO_RE = re.compile(r'\bTRANSPLANT(?:ING)?\b.*?:', re.IGNORECASE)
+WEEKS_BEFORE_RE = re.compile(r'(\d+)(?:\s*[–-]\s*(\d+))?\s+weeks\s+(?:before|prior)', re.IGNORECASE)
+NUMBER = r'(\d+\s*[/⁄]\s*\d+|\d+(?:\.\d+)?)'
+TEMPERATURE_RE = re.compile(r'(\d{2,3})(?:\s*[–-]\s*(\d{2,3}))?\s*°\s*F', re.IGNORECASE)
+SPACING_RE = re.compile(NUMBER + r'(?:\s*[–-]\s*' + NUMBER + r')?\s*(?:"|”|in\.?|inches?)\s+apart', re.IGNORECASE)
+DEPTH_RE = re.compile(NUMBER + r'(?:\s*[–-]\s*' + NUMBER + r')?\s*(?:"|”|in\.?|inches?)\s+deep', re.IGNORECASE)
+
+CACHE_SIZE = 65536
+# Distinct unknown headers remembered; scraped text can contain any number of them
+HEADER_CACHE_SIZE = 4096
+_cache = {}
+
+
+@functools.lru_cache(maxsize=HEADER_CACHE_SIZE)
+def _header_section(fragment):
+    key = fragment.upper().replace(":", "").strip()
+    for needles, section in HEADER_RULES:
+        if any(needle in key for needle in needles):
+            return (section, True)
+    return TEXT
+
+
+def _number(text):
+    numerator, slash, denominator = text.replace("⁄", "/").partition("/")
+    return float(numerator) / float(denominator) if slash else float(numerator)
+
+
+def _range(match, convert):
+    low = convert(match.group(1))
+    return (low, convert(match.group(2)) if match.group(2) else low)
+
+
+def _search(pattern, text, lower, keyword):
+    # pattern.search(text) for patterns that contain `keyword` (case-insensitively): texts
+    # without it are skipped, and the search starts at the fragment holding its first occurrence
+    if len(lower) != len(text):
+        return pattern.search(text)
+    index = lower.find(keyword)
+    if index < 0:
+        return None
+    return pattern.search(text, text.rfind("|", 0, index) + 1)
+
+
+def scan_directives(text, lower=None):
+    # The facts the schedule needs: (has transplant info, "Direct seed (recommended)",
+    # "Transplant (recommended)", weeks min, weeks max). Transplant info excludes "TRANSPLANTS:",
+    # which usually refers to yield.
+    lower = lower or text.lower()
+    match = _search(WEEKS_BEFORE_RE, text, lower, "weeks")
+    weeks_min = int(match.group(1)) if match else None
+    weeks_max = int(match.group(2)) if match and match.group(2) else weeks_min
+    return (_search(TRANSPLANT_INFO_RE, text, lower, "transplant") is not None, "Direct seed (recommended)" in text,
+            "Transplant (recommended)" in text, weeks_min, weeks_max)
+
+
+def extract_fields(text, lower=None):
+    # Typed values for the first mention of each: ranges are (min, max), lengths in inches
+    lower = lower or text.lower()
+    fields = {}
+    for name, pattern, keyword, convert in (("soil_temp_f", TEMPERATURE_RE, "°", int),
+                                            ("spacing_in", SPACING_RE, "apart", _number),
+                                            ("depth_in", DEPTH_RE, "deep", _number)):
+        match = _search(pattern, text, lower, keyword)
+        fields[name] = _range(match, convert) if match else None
+    return fields
+
+
+def tokenize(text):
+    # One pass over the "|"-separated fragments: headers switch the current section, everything
+    # else is escaped and appended to it. Returns {section: [markup fragments]}.
+    sections = {section: [] for section in SECTIONS}
+    current = None
+    for part in text.split("|"):
+        fragment = part.strip()
+        if not fragment:
+            continue
+        if fragment.endswith(":"):
+            header = HEADERS[fragment] if fragment in HEADERS else _header_section(fragment)
+            if header is None:
+                current = None
+                continue
+            if header is not TEXT:
+                current, bold = header
+                if bold:
+                    sections[current].append(f"<strong>{html.escape(fragment)}</strong>")
+                continue
+        if current:
+            sections[current].append(html.escape(fragment))
+    return sections
+
+
+NO_DIRECTIVES = (False, False, False, None, None)
+
+
+@functools.lru_cache(maxsize=8192)
+def growing_directives(text):
+    # scan_directives() for a growing info value (NO_DIRECTIVES when it is not text), without
+    # tokenizing it; this is all the schedule needs
+    return scan_directives(text) if isinstance(text, str) else NO_DIRECTIVES
+
+
+def growing_fields(text):
+    if not isinstance(text, str):
+        return {}
+    fields = extract_fields(text)
+    directives = growing_directives(text)
+    fields["weeks_before_transplant"] = directives[3:] if directives[3] is not None else None
+    return fields
+
+
+class GrowingInfo(dict):
+    # A parsed record. The section markup is filled in by the parse; "directives" and "fields"
+    # are only computed when first read, since most readers never need the typed fields.
+    def __missing__(self, key):
+        text = self["full_text"]
+        text = text if text != NO_INFO else None
+        if key == "directives":
+            value = growing_directives(text)
+        elif key == "fields":
+            value = growing_fields(text)
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+def _parse(text):
+    if not isinstance(text, str):
+        return GrowingInfo(dict.fromkeys(SECTIONS, "N/A"), full_text=NO_INFO)
+    sections = tokenize(text)
+    return GrowingInfo({section: " ".join(fragments) if fragments else "N/A" for section, fragments in sections.items()},
+                       full_text=text)
+
+
+def text_key(text):
+    # Records keep their text anyway, so the text itself is the key (None for missing values)
+    return text if isinstance(text, str) else None
+
+
+def parse_growing_info(text):
+    # Structured record for a growing info blob: section markup (culture, transplanting, pests,
+    # harvest; "N/A" when absent), the schedule directives and typed fields (both computed on
+    # first access, see GrowingInfo). Vendors share one blob between many varieties, so records
+    # are cached by their text. Records are shared between callers and must not be modified.
+    key = text_key(text)
+    info = _cache.get(key)
+    if info is None:
+        info = _store(key, _parse(text))
+    return info
+
+
+def remember(text, info):
+    # Adds a record parsed elsewhere (e.g. in a worker process) to the cache
+    return _store(text_key(text), info)
+
+
+def _store(key, info):
+    if len(_cache) >= CACHE_SIZE:
+        del _cache[next(iter(_cache))]
+    _cache[key] = info
+    return info
+
+
+def clear_cache():
+    _cache.clear()
+    _header_section.cache_clear()
+    growing_directives.cache_clear()
@@ -0,0 +1,391 @@
+import html
+import re
+from html.parser import HTMLParser
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Backends in order of preference. "strainer" builds a BeautifulSoup tree of only the product
+# regions; "html.parser" is the original full-tree parse and always works.
+BACKENDS = ["selectolax", "lxml", "strainer", "html.parser"]
+
+def _class_pattern(*names):
+    # Strainers see the raw class attribute ("product-name c-heading"), so match whole words
+    return re.compile(r'(?:^|\s)(?:%s)(?:\s|$)' % '|'.join(re.escape(n) for n in names))
+
+
+# Classes of the only regions of a product page we read
+PRODUCT_CLASSES = _class_pattern('product-name', 'c-facts__list', 's-lgc-pdp-content', 'c-product-image__img')
+HISTORY_CLASSES = _class_pattern('product-line-item-details')
+
+META_TAG_RE = re.compile(r'<meta\b[^>]*>', re.I)
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.I)
+ATTR_RE = re.compile(r'''([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''')
+GROWING_INFO_RE = re.compile(r"Growing Information", re.I)
+
+
+def available_backends():
+    available = []
+    for name in BACKENDS:
+        if name == "selectolax" and LexborHTMLParser is None:
+            continue
+        if name == "lxml" and lxml is None:
+            continue
+        available.append(name)
+    return available
+
+
+def resolve_backend(name=None):
+    if name in (None, "auto"):
+        return available_backends()[0]
+    if name not in available_backends():
+        raise ValueError(f"HTML parser backend '{name}' is not available (installed: {', '.join(available_backends())})")
+    return name
+
+
+def _empty_product():
+    return {"name": None, "facts": {}, "growing_info": None, "image_url": None}
+
+
+def _as_text(content):
+    # The fast backends get str when the page is UTF-8; anything else is left to their own
+    # charset detection
+    if isinstance(content, bytes):
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            return content
+    return content
+
+
+def _join_text(strings, separator):
+    # Same result as BeautifulSoup's get_text(separator, strip=True)
+    return separator.join(s for s in (s.strip() for s in strings) if s)
+
+
+def _fact_key(term_text, h3_text):
+    # Only use the <h3> text so the 'About' button text is ignored
+    if h3_text is not None:
+        return h3_text
+    return term_text.split('About')[0]
+
+
+# --- BeautifulSoup (html.parser / strainer) ---
+
+def _soup_product(soup, product):
+    name_tag = soup.find('h1', class_='product-name')
+    if name_tag:
+        product["name"] = name_tag.get_text(" ", strip=True)
+
+    facts_list = soup.find('dl', class_='c-facts__list')
+    if facts_list:
+        terms = facts_list.find_all('dt', class_='c-facts__term')
+        defs = facts_list.find_all('dd', class_='c-facts__definition')
+        for t, d in zip(terms, defs):
+            h3 = t.find('h3')
+            key = _fact_key(t.get_text(strip=True), h3.get_text(strip=True) if h3 else None)
+            product["facts"][key] = d.get_text(" ", strip=True)
+
+    growing_div = soup.find('div', class_='s-lgc-pdp-content')
+    if growing_div:
+        # Separate headers (SCIENTIFIC NAME:) from values with a pipe |
+        product["growing_info"] = growing_div.get_text(separator=" | ", strip=True)
+    return product
+
+
+def _soup_growing_info_fallback(soup):
+    # Look for the "Growing Information" accordion header and grab the panel body after it
+    header_link = soup.find('a', string=GROWING_INFO_RE)
+    if header_link:
+        header_div = header_link.find_parent('div', class_='c-accordion__header')
+        if header_div:
+            body = header_div.find_next_sibling('div', class_='c-accordion__body')
+            if body:
+                return body.get_text(separator=" | ", strip=True)
+    return None
+
+
+def _soup_image_url(soup):
+    og_image = soup.find("meta", property="og:image")
+    if og_image and og_image.get("content"):
+        return og_image.get("content")
+    img_tag = soup.find('img', class_='c-product-image__img')
+    if img_tag and img_tag.get('src'):
+        return img_tag.get('src')
+    img_tag = soup.find('img', itemprop='image')
+    if img_tag and img_tag.get('src'):
+        return img_tag.get('src')
+    return None
+
+
+def _parse_product_html_parser(content):
+    # bs4 is imported on first use: the scraper's default backends do not need it
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    product = _soup_product(soup, _empty_product())
+    if product["growing_info"] is None:
+        product["growing_info"] = _soup_growing_info_fallback(soup)
+    product["image_url"] = _soup_image_url(soup)
+    return product
+
+
+def _tag_attrs(tag):
+    attrs = {}
+    for m in ATTR_RE.finditer(tag):
+        value = next(v for v in m.group(2, 3, 4) if v is not None)
+        attrs.setdefault(m.group(1).lower(), html.unescape(value))
+    return attrs
+
+
+def _scan_image_url(text):
+    # Image lookups without a tree: scan only <meta>/<img> tags
+    for tag in META_TAG_RE.findall(text):
+        attrs = _tag_attrs(tag)
+        if attrs.get('property') == 'og:image' and attrs.get('content'):
+            return attrs['content']
+    for wanted in ('class', 'itemprop'):
+        for tag in IMG_TAG_RE.findall(text):
+            attrs = _tag_attrs(tag)
+            if wanted == 'class' and 'c-product-image__img' in attrs.get('class', '').split() and attrs.get('src'):
+                return attrs['src']
+            if wanted == 'itemprop' and attrs.get('itemprop') == 'image' and attrs.get('src'):
+                return attrs['src']
+    return None
+
+
+def _parse_product_strainer(content):
+    from bs4 import BeautifulSoup, SoupStrainer
+    parser = 'lxml' if lxml is not None else 'html.parser'
+    soup = BeautifulSoup(content, parser, parse_only=SoupStrainer(class_=PRODUCT_CLASSES))
+    product = _soup_product(soup, _empty_product())
+    if product["growing_info"] is None:
+        # Unusual page layout: the fallback needs the surrounding accordion, so parse everything
+        return _parse_product_html_parser(content)
+    text = content.decode(soup.original_encoding or 'utf-8', errors='replace') if isinstance(content, bytes) else content
+    product["image_url"] = _scan_image_url(text)
+    return product
+
+
+# --- lxml ---
+
+def _xclass(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _lxml_text(el, separator):
+    return _join_text(el.xpath('.//text()[not(parent::script) and not(parent::style)]'), separator)
+
+
+def _parse_product_lxml(content):
+    product = _empty_product()
+    tree = lxml.html.fromstring(_as_text(content))
+
+    name_tag = tree.xpath(f"(//h1[{_xclass('product-name')}])[1]")
+    if name_tag:
+        product["name"] = _lxml_text(name_tag[0], " ")
+
+    facts_list = tree.xpath(f"(//dl[{_xclass('c-facts__list')}])[1]")
+    if facts_list:
+        terms = facts_list[0].xpath(f".//dt[{_xclass('c-facts__term')}]")
+        defs = facts_list[0].xpath(f".//dd[{_xclass('c-facts__definition')}]")
+        for t, d in zip(terms, defs):
+            h3 = t.xpath(".//h3")
+            key = _fact_key(_lxml_text(t, ""), _lxml_text(h3[0], "") if h3 else None)
+            product["facts"][key] = _lxml_text(d, " ")
+
+    growing_div = tree.xpath(f"(//div[{_xclass('s-lgc-pdp-content')}])[1]")
+    if growing_div:
+        product["growing_info"] = _lxml_text(growing_div[0], " | ")
+    else:
+        for link in tree.xpath("//a"):
+            if not link.xpath("*") and GROWING_INFO_RE.search(link.text or ""):
+                header = link.xpath(f"ancestor::div[{_xclass('c-accordion__header')}][1]")
+                if header:
+                    body = header[0].xpath(f"following-sibling::div[{_xclass('c-accordion__body')}][1]")
+                    if body:
+                        product["growing_info"] = _lxml_text(body[0], " | ")
+                break
+
+    for query in ("//meta[@property='og:image']/@content",
+                  f"//img[{_xclass('c-product-image__img')}]/@src",
+                  "//img[@itemprop='image']/@src"):
+        found = [v for v in tree.xpath(query) if v]
+        if found:
+            product["image_url"] = str(found[0])
+            break
+    return product
+
+
+# --- selectolax (lexbor) ---
+
+def _lexbor_text(node, separator):
+    strings = (n.text(deep=False) for n in node.traverse(include_text=True)
+               if n.tag == '-text' and n.parent.tag not in ('script', 'style'))
+    return _join_text(strings, separator)
+
+
+def _lexbor_has_class(node, name):
+    return name in (node.attributes.get('class') or '').split()
+
+
+def _parse_product_selectolax(content):
+    product = _empty_product()
+    tree = LexborHTMLParser(_as_text(content))
+
+    name_tag = tree.css_first('h1.product-name')
+    if name_tag:
+        product["name"] = _lexbor_text(name_tag, " ")
+
+    facts_list = tree.css_first('dl.c-facts__list')
+    if facts_list:
+        terms = facts_list.css('dt.c-facts__term')
+        defs = facts_list.css('dd.c-facts__definition')
+        for t, d in zip(terms, defs):
+            h3 = t.css_first('h3')
+            key = _fact_key(_lexbor_text(t, ""), _lexbor_text(h3, "") if h3 else None)
+            product["facts"][key] = _lexbor_text(d, " ")
+
+    growing_div = tree.css_first('div.s-lgc-pdp-content')
+    if growing_div:
+        product["growing_info"] = _lexbor_text(growing_div, " | ")
+    else:
+        for link in tree.css('a'):
+            if next(link.iter(), None) is None and GROWING_INFO_RE.search(link.text() or ""):
+                header = link.parent
+                while header is not None and not (header.tag == 'div' and _lexbor_has_class(header, 'c-accordion__header')):
+                    header = header.parent
+                if header is not None:
+                    body = header.next
+                    while body is not None and not (body.tag == 'div' and _lexbor_has_class(body, 'c-accordion__body')):
+                        body = body.next
+                    if body is not None:
+                        product["growing_info"] = _lexbor_text(body, " | ")
+                break
+
+    for selector, attr in (('meta[property="og:image"]', 'content'),
+                           ('img.c-product-image__img', 'src'),
+                           ('img[itemprop="image"]', 'src')):
+        found = [n.attributes.get(attr) for n in tree.css(selector) if n.attributes.get(attr)]
+        if found:
+            product["image_url"] = found[0]
+            break
+    return product
+
+
+PRODUCT_PARSERS = {
+    "selectolax": _parse_product_selectolax,
+    "lxml": _parse_product_lxml,
+    "strainer": _parse_product_strainer,
+    "html.parser": _parse_product_html_parser,
+}
+
+
+def parse_product_fields(content, backend=None):
+    # Returns {"name", "facts", "growing_info", "image_url"}; missing values are None
+    return PRODUCT_PARSERS[resolve_backend(backend)](content)
+
+
+# --- Order history ---
+
+def _history_urls_soup(content, parser, strained):
+    from bs4 import BeautifulSoup, SoupStrainer
+    parse_only = SoupStrainer('div', class_=HISTORY_CLASSES) if strained else None
+    soup = BeautifulSoup(content, parser, parse_only=parse_only)
+    urls = []
+    for div in soup.find_all('div', class_='product-line-item-details'):
+        link = div.find('a', href=True)
+        if link:
+            urls.append(link['href'])
+    return urls
+
+
+def _history_urls_lxml(content):
+    tree = lxml.html.fromstring(_as_text(content))
+    urls = []
+    for div in tree.xpath(f"//div[{_xclass('product-line-item-details')}]"):
+        href = div.xpath("(.//a[@href])[1]/@href")
+        if href:
+            urls.append(str(href[0]))
+    return urls
+
+
+def _history_urls_selectolax(content):
+    tree = LexborHTMLParser(_as_text(content))
+    urls = []
+    for div in tree.css('div.product-line-item-details'):
+        link = div.css_first('a[href]')
+        if link:
+            urls.append(link.attributes.get('href'))
+    return urls
+
+
+class _HistoryLinkParser(HTMLParser):
+    # Event-driven pass over an order-history page: keeps only the stack of open divs and the
+    # first link of each product-line-item-details div, never a tree
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self._divs = []
+        self._waiting = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            classes = next((value for name, value in attrs if name == 'class'), None) or ''
+            if 'product-line-item-details' in classes.split():
+                self.links.append(None)
+                self._divs.append(len(self.links) - 1)
+                self._waiting.append(len(self.links) - 1)
+            else:
+                self._divs.append(None)
+        elif tag == 'a' and self._waiting:
+            href = next((value or '' for name, value in attrs if name == 'href'), None)
+            if href is not None:
+                for index in self._waiting:
+                    self.links[index] = href
+                self._waiting.clear()
+
+    def handle_endtag(self, tag):
+        if tag == 'div' and self._divs:
+            index = self._divs.pop()
+            if index is not None and index in self._waiting:
+                self._waiting.remove(index)
+
+
+def stream_history_urls(chunks):
+    # Same result as parse_history_urls() for a page given as an iterable of str chunks (e.g. a
+    # file read in blocks), so memory use does not grow with the size of the page
+    parser = _HistoryLinkParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return list(dict.fromkeys(link for link in parser.links if link is not None))
+
+
+def parse_history_urls(content, backend=None):
+    # Product links from a saved order-history page, duplicates removed, in page order
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        urls = _history_urls_selectolax(content)
+    elif backend == "lxml":
+        urls = _history_urls_lxml(content)
+    elif backend == "strainer":
+        urls = _history_urls_soup(content, 'lxml' if lxml is not None else 'html.parser', strained=True)
+    else:
+        urls = _history_urls_soup(content, 'html.parser', strained=False)
+    return list(dict.fromkeys(urls))
+
+
+def read_history_urls(path, backend=None, block_size=64 * 1024):
+    # parse_history_urls() for a file. The C backends parse the whole page at once, which is
+    # fastest; otherwise the page is streamed in blocks instead of building a BeautifulSoup tree.
+    with open(path, 'r', encoding='utf-8') as f:
+        if resolve_backend(backend) in ("selectolax", "lxml"):
+            return parse_history_urls(f.read(), backend)
+        return stream_history_urls(iter(lambda: f.read(block_size), ''))
@@ -0,0 +1,176 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Responses worth retrying: throttling and transient server/gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class RateLimiter:
+    # Token bucket per host: allows `burst` back-to-back requests, then refills at `rate` tokens/sec.
+    def __init__(self, rate=0.5, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        if not self.rate or self.rate <= 0:
+            return
+        host = urlsplit(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+
+class HttpStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def summary(self):
+        return f"{self.requests} requests, {self.retries} retries, {self.failures} failures, {self.bytes / 1024:.1f} KB downloaded"
+
+
+def parse_retry_after(value):
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class HttpClient:
+    def __init__(self, timeout=(10, 30), retries=3, backoff=1.0, max_backoff=60.0,
+                 pool_size=10, limiter=None, headers=None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = limiter
+        self.stats = HttpStats()
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        if headers:
+            self.session.headers.update(headers)
+        # Keep-alive pool shared by all worker threads
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _wait_before_retry(self, attempt, response=None):
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt))
+        delay *= random.uniform(0.5, 1.0)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = min(self.max_backoff, retry_after)
+        self.stats.add(retries=1)
+        time.sleep(delay)
+
+    def get(self, url, stream=False, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire(url)
+            self.stats.add(requests=1)
+            try:
+                response = self.session.get(url, stream=stream, **kwargs)
+            except RETRY_EXCEPTIONS:
+                if attempt >= self.retries:
+                    self.stats.add(failures=1)
+                    raise
+                self._wait_before_retry(attempt)
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                response.close()
+                self._wait_before_retry(attempt, response)
+                attempt += 1
+                continue
+
+            if response.status_code >= 400:
+                self.stats.add(failures=1)
+            if not stream:
+                self.stats.add(bytes=len(response.content))
+            return response
+
+    def download(self, url, filepath, chunk_size=64 * 1024):
+        # Stream the body to disk and return the status code. A connection dropped mid-body
+        # restarts the transfer; a partial file is never left at `filepath`.
+        tmp_path = f"{filepath}.part"
+        attempt = 0
+        while True:
+            response = self.get(url, stream=True)
+            try:
+                with response:
+                    if response.status_code != 200:
+                        return response.status_code
+                    with open(tmp_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size):
+                            f.write(chunk)
+                            self.stats.add(bytes=len(chunk))
+                os.replace(tmp_path, filepath)
+                return response.status_code
+            except RETRY_EXCEPTIONS:
+                if attempt >= self.retries:
+                    self.stats.add(failures=1)
+                    raise
+                self._wait_before_retry(attempt)
+                attempt += 1
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_default_client():
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient()
+        return _default_client
@@ -0,0 +1,262 @@
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from build_manifest import atomic_write, write_if_changed
+from instrumentation import PROFILER
+
+IMAGE_DIR = "site/images"
+SOURCES_FILE = "sources.json"
+THUMB_DIR = "thumbs"
+THUMB_INDEX = "index.json"
+# Crop pages show images at up to 200 CSS pixels; the larger widths cover high-DPI screens
+THUMB_WIDTHS = (200, 400, 600)
+THUMB_FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+DOWNLOAD_CHUNK = 256 * 1024
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_extension(url):
+    ext = os.path.splitext(url.split('?', 1)[0])[1].lower()
+    return ext if ext in IMAGE_EXTENSIONS else ".jpg"
+
+
+class ImageStore:
+    # Downloaded images are named after a hash of their content, so the same picture used by
+    # several products is stored once. sources.json maps each image URL to its file, so a URL
+    # is only downloaded once. Safe to share between scraper threads: a thread asking for a URL
+    # another thread is downloading waits for that download instead of starting its own.
+    def __init__(self, directory=IMAGE_DIR):
+        self.directory = directory
+        self.sources_path = os.path.join(directory, SOURCES_FILE)
+        self._lock = threading.Lock()
+        self._changed = False
+        # URL -> Future of the download in progress
+        self._pending = {}
+        try:
+            with open(self.sources_path, 'r', encoding='utf-8') as f:
+                self._sources = json.load(f)
+        except (OSError, ValueError):
+            self._sources = {}
+
+    def fetch(self, url, client):
+        # Returns the path relative to the site ("images/<hash>.jpg"), or None on failure
+        with self._lock:
+            name = self._sources.get(url)
+            if name and os.path.exists(os.path.join(self.directory, name)):
+                return f"images/{name}"
+            pending = self._pending.get(url)
+            if pending is None:
+                future = self._pending[url] = Future()
+        if pending is not None:
+            return pending.result()
+        # Waiters get the same result (or exception); a failed URL is tried again by later calls
+        try:
+            path = self._download(url, client)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(path)
+        finally:
+            with self._lock:
+                del self._pending[url]
+        return path
+
+    def _download(self, url, client):
+        os.makedirs(self.directory, exist_ok=True)
+        ext = image_extension(url)
+        incoming = os.path.join(self.directory, f".incoming-{os.getpid()}-{threading.get_ident()}{ext}")
+        if client.download(url, incoming, chunk_size=DOWNLOAD_CHUNK) != 200:
+            return None
+        PROFILER.transfer('image.download', bytes_in=os.path.getsize(incoming))
+        name = f"{file_hash(incoming)[:16]}{ext}"
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path):
+            os.remove(incoming)
+        else:
+            os.replace(incoming, path)
+        with self._lock:
+            self._sources[url] = name
+            self._changed = True
+        return f"images/{name}"
+
+    def save(self):
+        with self._lock:
+            if self._changed:
+                atomic_write(self.sources_path, json.dumps(self._sources, indent=1, sort_keys=True).encode('utf-8'))
+                self._changed = False
+
+
+def thumbnail_path(image, width, fmt):
+    # "images/<stem>.jpg" -> "images/thumbs/<stem>-<width>.<fmt>"; paths are relative to the site
+    directory, filename = os.path.split(image)
+    stem = os.path.splitext(filename)[0]
+    return f"{directory}/{THUMB_DIR}/{stem}-{width}.{fmt}"
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _flatten(im):
+    # Thumbnails are opaque: transparency is composited onto white
+    from PIL import Image, ImageOps
+    im = ImageOps.exif_transpose(im)
+    if im.mode in ('RGBA', 'LA') or (im.mode == 'P' and 'transparency' in im.info):
+        im = im.convert('RGBA')
+        background = Image.new('RGB', im.size, (255, 255, 255))
+        background.paste(im, mask=im.getchannel('A'))
+        return background
+    return im.convert('RGB')
+
+
+def make_thumbnails(job):
+    # job: (site_dir, image). Writes each width (never upscaled) in every format and returns
+    # the index entry for the image
+    # Pillow is only imported when there is something to resize
+    from PIL import Image
+    site_dir, image = job
+    source = os.path.join(site_dir, image)
+    with Image.open(source) as original:
+        im = _flatten(original)
+    width, height = im.size
+    widths = sorted({min(w, width) for w in THUMB_WIDTHS})
+    for w in widths:
+        resized = im if w == width else im.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+        for fmt, options in THUMB_FORMATS.items():
+            path = os.path.join(site_dir, thumbnail_path(image, w, fmt))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            resized.save(tmp_path, **options)
+            os.replace(tmp_path, path)
+    return {"width": width, "height": height, "widths": widths, "source": _source_stamp(source)}
+
+
+def _make_thumbnails_safe(job):
+    # An unreadable image is recorded without variants, so it is not retried until it changes.
+    # Images over Pillow's MAX_IMAGE_PIXELS (decompression bombs) are treated the same way
+    # rather than ending the whole build.
+    from PIL import Image
+    site_dir, image = job
+    try:
+        return make_thumbnails(job)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"Could not make thumbnails for {image}: {e}")
+        return {"widths": [], "source": _source_stamp(os.path.join(site_dir, image))}
+
+
+def _is_current(site_dir, image, entry):
+    if entry is None or entry.get("source") != _source_stamp(os.path.join(site_dir, image)):
+        return False
+    return all(os.path.exists(os.path.join(site_dir, thumbnail_path(image, w, fmt)))
+               for w in entry["widths"] for fmt in THUMB_FORMATS)
+
+
+def prepare_thumbnails(images, site_dir="site", jobs=1):
+    # Makes sure every image has its thumbnails and returns {image: index entry}. Images whose
+    # source file and thumbnails are unchanged since the last run are skipped; the rest are
+    # resized in a pool of `jobs` processes. Without Pillow no thumbnails are made and pages
+    # keep linking the original images.
+    if importlib.util.find_spec("PIL") is None:
+        return {}
+    index_path = os.path.join(site_dir, "images", THUMB_DIR, THUMB_INDEX)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    pending = []
+    for image in sorted(set(images)):
+        if not os.path.exists(os.path.join(site_dir, image)):
+            continue
+        if not _is_current(site_dir, image, index.get(image)):
+            pending.append(image)
+
+    PROFILER.count('images.resized', len(pending))
+    jobs_list = [(site_dir, image) for image in pending]
+    if jobs > 1 and len(jobs_list) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(jobs_list))) as pool:
+            results = list(pool.map(_make_thumbnails_safe, jobs_list))
+    else:
+        results = list(map(_make_thumbnails_safe, jobs_list))
+    index.update(zip(pending, results))
+    if pending:
+        write_if_changed(index_path, json.dumps(index, indent=1, sort_keys=True))
+    return {image: index[image] for image in images if image in index and index[image]["widths"]}
+
+
+def picture_sources(image, entry):
+    # What a page needs for <picture>: (width, path) lists per format and the size of the
+    # smallest variant, which is the fallback <img> and the layout size
+    widths = entry["widths"]
+    return {
+        "sources": {fmt: [(w, thumbnail_path(image, w, fmt)) for w in widths] for fmt in THUMB_FORMATS},
+        "src": thumbnail_path(image, widths[0], "jpg"),
+        "width": widths[0],
+        "height": max(1, round(entry["height"] * widths[0] / entry["width"])),
+    }
+
+
+def _link_or_copy(source, dest):
+    # Hard link where possible; a copy keeps the source's mtime so it is recognized next time
+    try:
+        if os.path.samefile(source, dest):
+            return False
+        source_stat, dest_stat = os.stat(source), os.stat(dest)
+        if (source_stat.st_size, source_stat.st_mtime_ns) == (dest_stat.st_size, dest_stat.st_mtime_ns):
+            return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = f"{dest}.tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, dest)
+    return True
+
+
+def share_images(images, thumbnails, image_root, site_dir):
+    # Puts the images (paths relative to a site, "images/<hash>.jpg") and their thumbnails from
+    # the site they were downloaded into, `image_root`, into `site_dir`, so every profile tree
+    # works on its own. Files are hard-linked when both are on one filesystem. Returns how many
+    # files were linked or copied.
+    if os.path.abspath(image_root) == os.path.abspath(site_dir):
+        return 0
+    paths = []
+    for image in images:
+        paths.append(image)
+        entry = thumbnails.get(image)
+        if entry is not None:
+            paths += [thumbnail_path(image, w, fmt) for w in entry["widths"] for fmt in THUMB_FORMATS]
+    shared = 0
+    for path in paths:
+        source = os.path.join(image_root, path)
+        if os.path.exists(source):
+            shared += _link_or_copy(source, os.path.join(site_dir, path))
+    return shared
+
+
+def srcset(site_root, sources):
+    return ", ".join(f"{site_root}/{path} {width}w" for width, path in sources)
@@ -0,0 +1,189 @@
+import contextlib
+import cProfile
+import io
+import json
+import math
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+from build_manifest import atomic_write
+
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(len(sorted_values) * fraction)) - 1]
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+    # Stage timings, counters and bytes in/out for one run. Disabled by default: stage() then
+    # returns a shared no-op context and the other methods return immediately, so the calls can
+    # stay in hot paths. Thread-safe; work done in worker processes is not collected, only the
+    # stages around it in the parent.
+    def __init__(self):
+        self.enabled = False
+        self.started = None
+        self.durations = {}
+        self.bytes_in = {}
+        self.bytes_out = {}
+        self.counters = {}
+        self._cpu = None
+        self._memory = False
+        self._lock = threading.Lock()
+        self._null = contextlib.nullcontext()
+
+    def start(self, cpu=False, memory=False):
+        self.enabled = True
+        self.started = time.perf_counter()
+        if memory:
+            tracemalloc.start()
+            self._memory = True
+        if cpu:
+            self._cpu = cProfile.Profile()
+            self._cpu.enable()
+
+    def stage(self, name):
+        return _Stage(self, name) if self.enabled else self._null
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.durations.setdefault(name, []).append(seconds)
+
+    def transfer(self, name, bytes_in=0, bytes_out=0):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.bytes_in[name] = self.bytes_in.get(name, 0) + bytes_in
+            self.bytes_out[name] = self.bytes_out.get(name, 0) + bytes_out
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        stages = {}
+        for name in self.durations.keys() | self.bytes_in.keys() | self.bytes_out.keys():
+            values = sorted(self.durations.get(name, []))
+            stages[name] = {
+                "calls": len(values),
+                "total": sum(values),
+                "mean": sum(values) / len(values) if values else 0.0,
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "max": values[-1] if values else 0.0,
+                "bytes_in": self.bytes_in.get(name, 0),
+                "bytes_out": self.bytes_out.get(name, 0),
+            }
+        report = {
+            "wall": time.perf_counter() - self.started if self.started else 0.0,
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["total"])),
+            "counters": dict(sorted(self.counters.items())),
+        }
+        if self._cpu is not None:
+            report["cpu"] = self._cpu_top()
+        if self._memory:
+            report["memory"] = self._memory_top()
+        return report
+
+    def _cpu_top(self):
+        self._cpu.disable()
+        stats = pstats.Stats(self._cpu, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({"function": f"{os.path.basename(filename)}:{line}({function})", "calls": calls,
+                         "own": own, "cumulative": cumulative})
+        rows.sort(key=lambda row: -row["cumulative"])
+        return rows[:TOP_FUNCTIONS]
+
+    def _memory_top(self):
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        top = [{"line": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+               for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]]
+        return {"current": current, "peak": peak, "top": top}
+
+    def summary(self, report):
+        lines = [f"Profile ({report['wall']:.2f}s wall):",
+                 f"  {'stage':<24} {'calls':>7} {'total':>9} {'p50':>9} {'p95':>9} {'max':>9} {'in':>10} {'out':>10}"]
+        for name, stage in report["stages"].items():
+            lines.append(f"  {name:<24} {stage['calls']:>7} {stage['total']:>8.3f}s {_ms(stage['p50'])} {_ms(stage['p95'])} "
+                         f"{_ms(stage['max'])} {_size(stage['bytes_in'])} {_size(stage['bytes_out'])}")
+        for name, value in report["counters"].items():
+            lines.append(f"  {name}: {value}")
+        if "memory" in report:
+            lines.append(f"  memory: peak {report['memory']['peak'] / 1024 / 1024:.1f} MB")
+        if "cpu" in report:
+            lines.append("  slowest functions (cumulative):")
+            for row in report["cpu"][:10]:
+                lines.append(f"    {row['cumulative']:8.3f}s {row['calls']:>8}  {row['function']}")
+        return "\n".join(lines)
+
+    def finish(self, path):
+        # Writes the JSON report and prints the summary
+        report = self.report()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self._cpu is not None:
+            self._cpu.dump_stats(f"{os.path.splitext(path)[0]}.prof")
+        if self._memory:
+            tracemalloc.stop()
+        atomic_write(path, json.dumps(report, indent=1).encode('utf-8'))
+        print(self.summary(report))
+        print(f"Profile report written to {path}")
+        return report
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:>7.1f}ms"
+
+
+def _size(count):
+    return f"{count / 1024:>8.1f}KB" if count else f"{'-':>10}"
+
+
+def add_profile_arguments(parser, default_report):
+    parser.add_argument('--profile', nargs='?', const=default_report, metavar='REPORT',
+                        help=f'Time each pipeline stage and write a JSON report (default path: {default_report})')
+    parser.add_argument('--profile-cpu', action='store_true', help='Profile with cProfile too (implies --profile; saved next to the report as .prof)')
+    parser.add_argument('--profile-memory', action='store_true', help='Trace memory allocations with tracemalloc too (implies --profile)')
+    parser.set_defaults(profile_default=default_report)
+
+
+def start_profiling(args):
+    if (args.profile_cpu or args.profile_memory) and not args.profile:
+        args.profile = args.profile_default
+    if args.profile:
+        PROFILER.start(cpu=args.profile_cpu, memory=args.profile_memory)
+
+
+def finish_profiling(args):
+    if args.profile:
+        PROFILER.finish(args.profile)
+
+
+PROFILER = Profiler()
@@ -0,0 +1,122 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from build_manifest import atomic_write
+from html_parsing import read_history_urls
+from image_store import file_hash
+from instrumentation import PROFILER
+
+HISTORY_MANIFEST = "data/cache/order_history.json"
+# Bump when URL extraction changes, so every file is parsed again
+EXTRACTOR_VERSION = 1
+
+
+def find_history_files(input_path):
+    # Order history pages under a directory (sorted), or the file itself
+    if os.path.isfile(input_path):
+        return [input_path]
+    html_files = []
+    for root, dirs, files in os.walk(input_path):
+        dirs.sort()
+        for file in sorted(files):
+            if file.lower().endswith('.html'):
+                html_files.append(os.path.join(root, file))
+    return html_files
+
+
+def _stamp(stat):
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _extract(job):
+    # Runs in a worker process: (path, known hash, backend) -> (path, hash, urls or None, error).
+    # urls is None when the content hash matches the manifest, i.e. the file was only touched.
+    path, known_hash, backend = job
+    try:
+        digest = file_hash(path)
+        if digest == known_hash:
+            return path, digest, None, None
+        return path, digest, read_history_urls(path, backend), None
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return path, None, None, str(e)
+
+
+class HistoryManifest:
+    # Product URLs extracted from each order history file, keyed by absolute path and stored
+    # with the file's size, mtime and content hash. A file whose size and mtime are unchanged is
+    # not opened again; one whose content hash is unchanged is not parsed again. With `rescan`
+    # the saved entries are ignored and replaced.
+    def __init__(self, path=HISTORY_MANIFEST, rescan=False):
+        self.path = path
+        self._changed = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = {} if rescan else json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self._files = data.get("files", {}) if data.get("version") == EXTRACTOR_VERSION else {}
+
+    def lookup(self, path, stat):
+        # Returns (urls, None) for an unchanged file, or (None, known hash) when it must be checked
+        entry = self._files.get(os.path.abspath(path))
+        if entry is None:
+            return None, None
+        if entry["stamp"] == _stamp(stat):
+            return entry["urls"], None
+        return None, entry["sha256"]
+
+    def update(self, path, digest, urls=None):
+        # Records a checked file; urls=None keeps the URLs already recorded for it
+        key = os.path.abspath(path)
+        if urls is None:
+            urls = self._files[key]["urls"]
+        self._files[key] = {"stamp": _stamp(os.stat(path)), "sha256": digest, "urls": urls}
+        self._changed = True
+        return urls
+
+    def prune(self):
+        # Forgets files that no longer exist
+        for key in [key for key in self._files if not os.path.exists(key)]:
+            del self._files[key]
+            self._changed = True
+
+    def save(self):
+        if self._changed:
+            data = {"version": EXTRACTOR_VERSION, "files": self._files}
+            atomic_write(self.path, json.dumps(data, indent=1, sort_keys=True).encode('utf-8'))
+            self._changed = False
+
+
+def collect_history_urls(html_files, manifest, backend=None, jobs=1):
+    # Unique product URLs across the files, in file order. Only new and changed files are
+    # read, `jobs` at a time in worker processes; the rest come from the manifest.
+    # Returns (urls, number of files parsed, errors as {path: message}).
+    found = {}
+    pending = []
+    with PROFILER.stage('history.scan'):
+        for path in html_files:
+            urls, known_hash = manifest.lookup(path, os.stat(path))
+            if urls is None:
+                pending.append((path, known_hash, backend))
+            found[path] = urls
+    PROFILER.count('history.files.unchanged', len(html_files) - len(pending))
+    PROFILER.count('history.files.parsed', len(pending))
+
+    errors = {}
+    with PROFILER.stage('history.parse'):
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                results = list(pool.map(_extract, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+        else:
+            results = list(map(_extract, pending))
+    for path, digest, urls, error in results:
+        if error:
+            errors[path] = error
+            continue
+        found[path] = manifest.update(path, digest, urls)
+
+    all_urls = {}
+    for path in html_files:
+        all_urls.update(dict.fromkeys(found[path] or []))
+    return list(all_urls), len(pending), errors
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+DAY = 24 * 60 * 60
+
+
+class PageCache:
+    # On-disk HTTP response cache keyed by URL. Each entry is a pair of files named after the
+    # URL hash: <hash>.html holds the body, <hash>.json the validators (ETag/Last-Modified),
+    # timestamps and the record parsed from the body, so a 304 never needs re-parsing.
+    def __init__(self, cache_dir, max_age=0, ttl=365 * DAY, max_bytes=500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.html"
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url or not os.path.exists(body_path):
+            return None
+        return entry
+
+    def read_body(self, url):
+        _, body_path = self._paths(url)
+        with open(body_path, 'rb') as f:
+            return f.read()
+
+    def is_fresh(self, entry):
+        return self.max_age > 0 and time.time() - entry.get('validated_at', 0) < self.max_age
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response, record):
+        meta_path, body_path = self._paths(url)
+        now = time.time()
+        entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': now,
+            'validated_at': now,
+            'size': len(response.content),
+            'record': record,
+        }
+        self._write_atomic(body_path, response.content)
+        self._write_atomic(meta_path, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+
+    def update(self, url, entry, record=None):
+        # Mark an entry as revalidated (after a 304), optionally attaching a freshly parsed record
+        meta_path, _ = self._paths(url)
+        entry = dict(entry, validated_at=time.time())
+        if record is not None:
+            entry['record'] = record
+        self._write_atomic(meta_path, json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+
+    def prune(self):
+        # Drop entries not validated within the TTL, then the least recently validated ones
+        # until the cache fits in max_bytes. Returns the number of entries removed.
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            body_path = meta_path[:-len('.json')] + '.html'
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    validated_at = json.load(f).get('validated_at', 0)
+                size = os.path.getsize(meta_path) + os.path.getsize(body_path)
+            except (OSError, ValueError):
+                validated_at, size = 0, 0
+            entries.append((validated_at, size, meta_path, body_path))
+
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for validated_at, size, meta_path, body_path in entries:
+            if validated_at >= cutoff and total <= self.max_bytes:
+                break
+            for path in (meta_path, body_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def summary(self):
+        return f"{self.hits} fresh hits, {self.revalidated} not modified (304), {self.misses} downloaded"
@@ -0,0 +1,87 @@
+import datetime
+import math
+
+FORMAT_VERSION = 2
+# Fixed, so method codes do not depend on which methods the catalog happens to use
+METHODS = ["Direct Sow", "Start Indoors"]
+# Columns the schedule page can sort by, in the order of the original table headers
+SORT_COLUMNS = ["Crop", "Variety", "Method", "SortDate", "SortTransplantDate", "SortDTM"]
+
+
+def _sort_key(row, column):
+    # Same ordering as the page's original comparator: strings case-insensitively, and
+    # direct-sown rows (no transplant date) before everything else
+    if column == "SortDate":
+        return row["Start"]
+    if column == "SortTransplantDate":
+        return row["Transplant"] if row["Method"] == "Start Indoors" else datetime.date.min
+    if column == "SortDTM":
+        return row["SortDTM"]
+    return row[column].lower()
+
+
+def _dtm_text(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def encode_schedule(rows, year):
+    # Columnar schedule with one shard per crop. Each shard depends only on its own crop's
+    # rows, so adding a packet rewrites that crop's shard and the index but no other shard.
+    # Rows are numbered by crop (first-seen order) and then table order; the index gives each
+    # shard's offset. Days to maturity are dictionary-encoded per shard, dates are day numbers
+    # counted from Jan 1 of `year`, and each shard lists its rows in order of every sortable
+    # column, so the page merges whatever shards it has loaded instead of sorting them.
+    base = datetime.date(year, 1, 1)
+    by_crop = {}
+    for row in rows:
+        by_crop.setdefault(row["Crop"], []).append(row)
+    method_codes = {method: code for code, method in enumerate(METHODS)}
+
+    def day(date):
+        return (date - base).days
+
+    shards = []
+    for crop, shard_rows in by_crop.items():
+        dtms = list(dict.fromkeys(_dtm_text(row["DTM"]) for row in shard_rows))
+        dtm_codes = {dtm: code for code, dtm in enumerate(dtms)}
+        order = {}
+        for column in SORT_COLUMNS:
+            keys = [_sort_key(row, column) for row in shard_rows]
+            # Stable sort, so ties keep table order
+            order[column] = sorted(range(len(shard_rows)), key=keys.__getitem__)
+        shards.append({
+            "crop": crop,
+            "page": shard_rows[0]["Page"],
+            "rows": len(shard_rows),
+            "variety": [row["Variety"] for row in shard_rows],
+            "search": [row["Variety"].lower() for row in shard_rows],
+            "anchor": [row["Anchor"] for row in shard_rows],
+            "method": [method_codes[row["Method"]] for row in shard_rows],
+            "dtms": dtms,
+            "dtm": [dtm_codes[_dtm_text(row["DTM"])] for row in shard_rows],
+            "sort_dtm": [row["SortDTM"] for row in shard_rows],
+            "start": [day(row["Start"]) for row in shard_rows],
+            "start_end": [day(row["StartEnd"]) for row in shard_rows],
+            "transplant": [day(row["Transplant"]) for row in shard_rows],
+            "transplant_end": [day(row["TransplantEnd"]) for row in shard_rows],
+            "order": order,
+        })
+
+    crops = []
+    offset = 0
+    for shard in shards:
+        crops.append({"crop": shard["crop"], "offset": offset, "rows": shard["rows"]})
+        offset += shard["rows"]
+    index = {
+        "format": FORMAT_VERSION,
+        "year": year,
+        "rows": len(rows),
+        "methods": METHODS,
+        "sort_columns": SORT_COLUMNS,
+        "crops": crops,
+    }
+    return index, shards
@@ -1,275 +1,242 @@
 import argparse
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import re
 import os
 import sys
-
-def extract_urls_from_history(html_path):
-    if not os.path.exists(html_path):
-        raise FileNotFoundError(f"File {html_path} not found.")
-
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
-
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Find all product line items
-    product_divs = soup.find_all('div', class_='product-line-item-details')
-
-    urls = []
-    for div in product_divs:
-        # Find the anchor tag within the details div
-        link = div.find('a', href=True)
-        if link:
-            urls.append(link['href'])
-
-    # Remove duplicates (images and titles often both have links)
-    unique_urls = list(dict.fromkeys(urls))
-    return unique_urls
-
-def create_slug(name):
-    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
-
-def download_image(img_url, product_name, output_dir="site/images"):
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from generate_garden_data import GenerateError, generate_site, print_results
+from html_parsing import available_backends, parse_product_fields
+from http_client import HttpClient, RateLimiter, get_default_client
+from image_store import ImageStore
+from instrumentation import PROFILER, add_profile_arguments, finish_profiling, start_profiling
+from order_history import HISTORY_MANIFEST, HistoryManifest, collect_history_urls, find_history_files
+from page_cache import DAY, PageCache
+from seed_store import SeedStore, is_store_path
+
+def download_image(img_url, product_name, images=None, client=None):
     if not img_url:
         return None
-    
-    try:
-        os.makedirs(output_dir, exist_ok=True)
-        slug = create_slug(product_name)
-        ext = os.path.splitext(img_url)[1]
-        if not ext or len(ext) > 5: # Basic check if ext is valid
-            ext = ".jpg"
-        
-        filename = f"{slug}{ext}"
-        filepath = os.path.join(output_dir, filename)
-        
-        # Check if image already exists
-        if os.path.exists(filepath):
-            return f"images/{filename}"
 
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(img_url, headers=headers, stream=True)
-        if response.status_code == 200:
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(1024):
-                    f.write(chunk)
-            return f"images/{filename}"
-        else:
+    try:
+        images = images or ImageStore()
+        with PROFILER.stage('image.download'):
+            image_path = images.fetch(img_url, client or get_default_client())
+        if image_path is None:
             print(f"Failed to download image: {img_url}")
-            return None
+        return image_path
     except Exception as e:
         print(f"Error downloading image for {product_name}: {e}")
         return None
 
-def scrape_johnnys_precise(url):
+def scrape_johnnys_precise(url, client=None, cache=None, parser=None, images=None):
     try:
-        # Headers to mimic a real browser
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers)
+        client = client or get_default_client()
+        entry = cache.get(url) if cache else None
+
+        if entry and entry.get('record') and cache.is_fresh(entry):
+            cache.count('hits')
+            PROFILER.count('page.cache_hit')
+            return entry['record']
+
+        headers = cache.conditional_headers(entry) if entry else {}
+        with PROFILER.stage('page.fetch'):
+            response = client.get(url, headers=headers)
+        PROFILER.transfer('page.fetch', bytes_in=len(response.content))
+        PROFILER.count(f'page.status_{response.status_code}')
+
+        if response.status_code == 304 and entry:
+            # Unchanged since the last scrape: reuse the parsed record without re-parsing
+            cache.count('revalidated')
+            record = entry.get('record') or parse_product_page(cache.read_body(url), url, client, parser, images)
+            cache.update(url, entry, record)
+            return record
+
         if response.status_code != 200:
             return None
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # --- 1. Product Name ---
-        name_tag = soup.find('h1', class_='product-name')
-        product_name = name_tag.get_text(" ", strip=True) if name_tag else "Unknown"
-
-        # --- 2. Quick Facts (Fixed Logic) ---
-        # We iterate through the Description List (dl)
-        quick_facts = {}
-        facts_list = soup.find('dl', class_='c-facts__list')
-        
-        if facts_list:
-            terms = facts_list.find_all('dt', class_='c-facts__term')
-            defs = facts_list.find_all('dd', class_='c-facts__definition')
-            
-            for t, d in zip(terms, defs):
-                # FIX: Only get the text from the <h3> tag to ignore the 'About' button text
-                h3 = t.find('h3')
-                if h3:
-                    key = h3.get_text(strip=True)
-                else:
-                    # Fallback if no h3, but strip out the button text if present
-                    key = t.get_text(strip=True).split('About')[0]
-                
-                # Clean the value
-                val = d.get_text(" ", strip=True)
-                quick_facts[key] = val
-
-        # --- 3. Growing Information (Fixed Logic) ---
-        # The data is inside 's-lgc-pdp-content' inside the accordion
-        growing_info_text = "N/A"
-        
-        # Method A: Look for specific class from your file
-        growing_div = soup.find('div', class_='s-lgc-pdp-content')
-        
-        # Method B: Fallback - Look for the header "Growing Information" and grab the next container
-        if not growing_div:
-            header_link = soup.find('a', string=re.compile(r"Growing Information", re.I))
-            if header_link:
-                # Go up to the header, then find the next sibling div (the panel body)
-                header_div = header_link.find_parent('div', class_='c-accordion__header')
-                if header_div:
-                    growing_div = header_div.find_next_sibling('div', class_='c-accordion__body')
-
-        if growing_div:
-            # Get text, separating headers (SCIENTIFIC NAME:) from values with a pipe |
-            growing_info_text = growing_div.get_text(separator=" | ", strip=True)
-
-        # --- 4. Image URL ---
-        image_url = None
-        # Try Open Graph image first
-        og_image = soup.find("meta", property="og:image")
-        if og_image:
-            image_url = og_image.get("content")
-        
-        # Fallback to finding img tag if needed, but og:image is usually best for scraping
-        if not image_url:
-            # Look for main product image
-            img_tag = soup.find('img', class_='c-product-image__img')
-            if img_tag:
-                 image_url = img_tag.get('src')
-        
-        # Try Schema.org itemprop="image"
-        if not image_url:
-             img_tag = soup.find('img', itemprop='image')
-             if img_tag:
-                 image_url = img_tag.get('src')
-
-        if not image_url:
-            # Look for main product image with class (Salesforce Commerce Cloud standard)
-            img_tag = soup.find('img', class_='c-product-image__img')
-            if img_tag:
-                 image_url = img_tag.get('src')
-
-        image_path = "N/A"
-        if image_url:
-            image_path = download_image(image_url, product_name)
-
-        return {
-            'Product Name': product_name,
-            'Latin Name': quick_facts.get('Latin Name', 'N/A'),
-            'Days to Maturity': quick_facts.get('Days To Maturity', 'N/A'),
-            'Life Cycle': quick_facts.get('Life Cycle', 'N/A'),
-            'Hybrid Status': quick_facts.get('Hybrid Status', 'N/A'),
-            'Disease Resistance': quick_facts.get('Disease Resistance Codes', 'N/A'),
-            'Growing Info': growing_info_text,
-            'URL': url,
-            'Image Path': image_path if image_path else "N/A"
-        }
+        record = parse_product_page(response.content, url, client, parser, images)
+        if cache:
+            cache.count('misses')
+            with PROFILER.stage('page.cache_write'):
+                cache.store(url, response, record)
+        return record
 
     except Exception as e:
         print(f"Error extracting {url}: {e}")
         return None
 
-def main():
+def parse_product_page(content, url, client=None, parser=None, images=None):
+    with PROFILER.stage('page.parse'):
+        fields = parse_product_fields(content, parser)
+    product_name = fields["name"] or "Unknown"
+    quick_facts = fields["facts"]
+    growing_info_text = fields["growing_info"] or "N/A"
+    image_url = fields["image_url"]
+
+    image_path = "N/A"
+    if image_url:
+        image_path = download_image(image_url, product_name, images, client)
+
+    return {
+        'Product Name': product_name,
+        'Latin Name': quick_facts.get('Latin Name', 'N/A'),
+        'Days to Maturity': quick_facts.get('Days To Maturity', 'N/A'),
+        'Life Cycle': quick_facts.get('Life Cycle', 'N/A'),
+        'Hybrid Status': quick_facts.get('Hybrid Status', 'N/A'),
+        'Disease Resistance': quick_facts.get('Disease Resistance Codes', 'N/A'),
+        'Growing Info': growing_info_text,
+        'URL': url,
+        'Image Path': image_path if image_path else "N/A"
+    }
+
+def open_seed_store(output):
+    # A .csv output keeps its store next to it (same name, .sqlite) and is re-exported after
+    # the run. A new store starts from the matching CSV if there is one.
+    if is_store_path(output):
+        store_path, csv_path = output, None
+    else:
+        store_path, csv_path = os.path.splitext(output)[0] + '.sqlite', output
+    legacy_csv = csv_path or os.path.splitext(output)[0] + '.csv'
+    is_new = not os.path.exists(store_path)
+    store = SeedStore(store_path)
+    if is_new and os.path.exists(legacy_csv):
+        count = store.import_csv(legacy_csv)
+        print(f"Imported {count} rows from {legacy_csv} into {store_path}")
+    return store, csv_path
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Scrape Johnny\'s Seeds data from order history.')
     parser.add_argument('input_path', nargs='?', default='orders', help='Path to the order history HTML file or directory (default: orders)')
-    parser.add_argument('output_csv', nargs='?', default='data/garden_seeds.csv', help='Path to the output CSV file (default: data/garden_seeds.csv)')
-    parser.add_argument('--overwrite', action='store_true', help='Overwrite existing data even if URL is already scraped')
+    parser.add_argument('output', nargs='?', default='data/garden_seeds.sqlite', help='Seed store (.sqlite), or a CSV file kept in sync with a store next to it (default: data/garden_seeds.sqlite)')
+    parser.add_argument('--overwrite', action='store_true', help='Re-scrape URLs that are already in the store and replace their rows')
     parser.add_argument('--limit', type=int, help='Limit the number of items to process')
+    parser.add_argument('--workers', type=int, default=4, help='Number of product pages to fetch concurrently (default: 4)')
+    parser.add_argument('--rate', type=float, default=0.5, help='Requests per second allowed per host (default: 0.5)')
+    parser.add_argument('--burst', type=int, default=2, help='Requests allowed back-to-back per host before rate limiting (default: 2)')
+    parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds (default: 30)')
+    parser.add_argument('--retries', type=int, default=3, help='Retries for connection errors and 429/5xx responses (default: 3)')
+    parser.add_argument('--parser', default='auto', choices=['auto'] + available_backends(), help='HTML parser backend (default: fastest installed)')
+    parser.add_argument('--cache-dir', default='data/cache/pages', help='Directory for cached product pages (default: data/cache/pages)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the product page cache')
+    parser.add_argument('--max-age', type=float, default=0, help='Days a cached page is reused without asking the server; older pages are revalidated with a conditional GET (default: 0, always revalidate)')
+    parser.add_argument('--cache-ttl', type=float, default=365, help='Days after which an unused cached page is evicted (default: 365)')
+    parser.add_argument('--cache-max-mb', type=float, default=500, help='Maximum cache size in MB; least recently used pages are evicted first (default: 500)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Processes used to parse new or changed order history files (default: number of CPUs)')
+    parser.add_argument('--history-manifest', default=HISTORY_MANIFEST, help=f'File remembering the URLs found in each order history file, so unchanged files are skipped (default: {HISTORY_MANIFEST})')
+    parser.add_argument('--rescan', action='store_true', help='Parse every order history file again instead of trusting the manifest')
+    add_profile_arguments(parser, 'data/profile/scrape.json')
     
-    args = parser.parse_args()
-    
-    # Determine input files
-    html_files = []
-    if os.path.isdir(args.input_path):
-        for root, dirs, files in os.walk(args.input_path):
-            for file in files:
-                if file.lower().endswith('.html'):
-                    html_files.append(os.path.join(root, file))
-    elif os.path.isfile(args.input_path):
-        html_files.append(args.input_path)
-    else:
-        print(f"Error: Input path '{args.input_path}' not found.")
-        return
-
-    if not html_files:
-        print(f"No HTML files found in {args.input_path}")
-        return
-
-    print(f"Processing {len(html_files)} order history files...")
-    all_urls = set()
-    for html_file in html_files:
-        print(f"  Reading {html_file}...")
-        try:
-            file_urls = extract_urls_from_history(html_file)
-            all_urls.update(file_urls)
-        except Exception as e:
-            print(f"  Error reading {html_file}: {e}")
-
-    urls = list(all_urls)
-    print(f"Found {len(urls)} unique product URLs across all files.")
-    
-    # Load existing data to check for duplicates
-    existing_urls = set()
-    # Create output directory if it doesn't exist
-    os.makedirs(os.path.dirname(args.output_csv), exist_ok=True)
+    args = parser.parse_args(argv)
+    start_profiling(args)
+    # Every exit, including the early returns, writes the profile
+    try:
+        # Determine input files
+        if not os.path.exists(args.input_path):
+            print(f"Error: Input path '{args.input_path}' not found.")
+            return
+        html_files = find_history_files(args.input_path)
+
+        if not html_files:
+            print(f"No HTML files found in {args.input_path}")
+            return
+
+        print(f"Processing {len(html_files)} order history files...")
+        manifest = HistoryManifest(args.history_manifest, rescan=args.rescan)
+        urls, parsed, errors = collect_history_urls(html_files, manifest, args.parser, args.jobs)
+        for html_file, error in errors.items():
+            print(f"  Error reading {html_file}: {error}")
+        manifest.prune()
+        manifest.save()
+        print(f"  {parsed} new or changed, {len(html_files) - parsed} unchanged.")
+
+        print(f"Found {len(urls)} unique product URLs across all files.")
     
-    if os.path.exists(args.output_csv):
+        # Already-scraped URLs are looked up in the store's unique URL index
+        store, csv_path = open_seed_store(args.output)
+        known = len(store)
+        if known:
+            print(f"Resuming from {store.path}. {known} items already scraped.")
+
+        print("Scraping product data...")
+        pending = [url for url in urls if args.overwrite or not store.has(url)]
+        client = HttpClient(
+            timeout=args.timeout,
+            retries=args.retries,
+            pool_size=max(1, args.workers) * 2,
+            limiter=RateLimiter(rate=args.rate, burst=args.burst),
+        )
+        cache = None
+        if not args.no_cache:
+            cache = PageCache(
+                args.cache_dir,
+                max_age=args.max_age * DAY,
+                ttl=args.cache_ttl * DAY,
+                max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            )
+        images = ImageStore()
+        scraped_count = 0
+
+        # Keep up to --workers pages in flight; results are written from this thread only, and
+        # committed to the store in small batches (an interrupted run loses at most one batch,
+        # which the page cache makes cheap to redo).
+        with store, ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            queue = iter(enumerate(pending))
+            in_flight = {}
+
+            def submit_next():
+                for i, url in queue:
+                    print(f"[{i+1}/{len(pending)}] Scraping {url}...")
+                    in_flight[executor.submit(scrape_johnnys_precise, url, client, cache, args.parser, images)] = url
+                    return True
+                return False
+
+            while True:
+                while len(in_flight) < max(1, args.workers):
+                    if args.limit and scraped_count + len(in_flight) >= args.limit:
+                        break
+                    if not submit_next():
+                        break
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    res = future.result()
+                    if res:
+                        print(f"  Found: {res['Product Name']} - DTM: {res['Days to Maturity']}")
+                        with PROFILER.stage('store.write'):
+                            store.upsert(res)
+                        scraped_count += 1
+                    else:
+                        print(f"  Failed to scrape {url}")
+
+            if args.limit and scraped_count >= args.limit:
+                print(f"Reached limit of {args.limit} scraped items.")
+
+            if csv_path:
+                with PROFILER.stage('store.export_csv'):
+                    store.export_csv(csv_path)
+            # The whole catalog goes to the generator in memory, not through a file it re-reads
+            records = list(store.rows())
+
+        images.save()
+        client.close()
+        print(f"HTTP: {client.stats.summary()}")
+        if cache:
+            removed = cache.prune()
+            print(f"Page cache: {cache.summary()}" + (f", {removed} evicted" if removed else ""))
+        print(f"Scraping complete! Data saved to {csv_path or args.output}")
+
+        # Trigger Site Generation, in this process: the report of a profiled run covers both
+        print("\nStarting site generation...")
         try:
-            df_existing = pd.read_csv(args.output_csv, encoding='utf-8')
-            if 'URL' in df_existing.columns:
-                existing_urls = set(df_existing['URL'].tolist())
-            print(f"Resuming from {args.output_csv}. {len(existing_urls)} items already scraped.")
-        except Exception as e:
-            print(f"Warning: Could not read existing CSV: {e}")
-
-    print("Scraping product data...")
-    scraped_count = 0
-    
-    for i, url in enumerate(urls):
-        if args.limit and scraped_count >= args.limit:
-            print(f"Reached limit of {args.limit} scraped items.")
-            break
-
-        if url in existing_urls and not args.overwrite:
-            # Silent skip or maybe just log if verbose, but let's keep it clean
-            continue
-
-        print(f"[{i+1}/{len(urls)}] Scraping {url}...")
-        res = scrape_johnnys_precise(url)
-        
-        if res:
-            print(f"  Found: {res['Product Name']} - DTM: {res['Days to Maturity']}")
-            
-            # Iterative Save
-            df_new = pd.DataFrame([res])
-            # Check if header is needed (file doesn't exist or is empty)
-            header = not os.path.exists(args.output_csv) or os.stat(args.output_csv).st_size == 0
-            df_new.to_csv(args.output_csv, mode='a', header=header, index=False, encoding='utf-8')
-            scraped_count += 1
-            
-            # Add to existing urls so we don't try to scrape it again if there are duplicates in the list somehow
-            existing_urls.add(url)
-        else:
-            print(f"  Failed to scrape {url}")
-        
-        time.sleep(2) # Respectful delay
-
-    print(f"Scraping complete! Data saved to {args.output_csv}")
-    
-    # Trigger Site Generation
-    print("\nStarting site generation...")
-    import subprocess
-    try:
-        generate_script = os.path.join(os.path.dirname(__file__), 'generate_garden_data.py')
-        result = subprocess.run([sys.executable, generate_script, args.output_csv], check=True)
-        if result.returncode == 0:
+            print_results(generate_site(records))
             print("Site generation successful!")
-        else:
-            print("Site generation failed.")
-    except Exception as e:
-        print(f"Error running site generation: {e}")
+        except GenerateError as e:
+            print(f"Site generation failed: {e}")
+            return 1
+    finally:
+        finish_profiling(args)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import functools
+import html
+import re
+import unicodedata
+
+from growing_info import NO_INFO
+
+FORMAT_VERSION = 1
+# Weight of one occurrence of a term in each field of a variety
+FIELD_WEIGHTS = {"name": 8, "crop": 6, "resistance": 4, "latin": 3, "pests": 3, "growing": 1}
+STOPWORDS = sorted({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "into", "is", "it",
+    "its", "of", "on", "or", "so", "than", "that", "the", "their", "then", "there", "they", "this", "to",
+    "was", "when", "where", "which", "while", "will", "with",
+})
+# Suffix stemmer shipped with the index, so the search page stems queries with exactly the same
+# rules: in each step the first (suffix, replacement, minimum stem length) that matches is
+# applied. Suffixes mapped to themselves protect words such as "grass" from later rules.
+STEMMER = [
+    [["ational", "ate", 2], ["ization", "ize", 2], ["fulness", "ful", 2], ["iveness", "ive", 2], ["ousness", "ous", 2],
+     ["sses", "ss", 1], ["ies", "y", 2], ["ss", "ss", 0], ["us", "us", 0], ["is", "is", 0],
+     ["ances", "", 3], ["ences", "", 3], ["ance", "", 3], ["ence", "", 3], ["ments", "", 3], ["ment", "", 3],
+     ["ings", "", 3], ["ing", "", 3], ["ants", "", 3], ["ant", "", 3], ["ents", "", 3], ["ent", "", 3],
+     ["edly", "", 3], ["ed", "", 3], ["es", "", 3], ["s", "", 3]],
+    [["e", "", 3]],
+]
+# Shards are split by one more character of the term prefix while larger than this
+SHARD_BYTES = 48 * 1024
+MAX_PREFIX = 4
+DOC_BLOCK = 1000
+
+COMBINING_RE = re.compile('[\u0300-\u036f]')
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+DIGIT_RE = re.compile(r'\d')
+TAG_RE = re.compile(r'<[^>]+>')
+_STOPWORDS = frozenset(STOPWORDS)
+
+
+@functools.lru_cache(maxsize=65536)
+def stem(word):
+    # Must stay in step with stem() on the search page
+    if DIGIT_RE.search(word):
+        return word
+    for rules in STEMMER:
+        for suffix, replacement, min_stem in rules:
+            if word.endswith(suffix) and len(word) - len(suffix) >= min_stem:
+                word = word[:len(word) - len(suffix)] + replacement
+                break
+    return word
+
+
+def tokenize(text):
+    # Accents folded, lowercased, split on anything but letters and digits; single characters
+    # and stopwords dropped. Must stay in step with tokenize() on the search page.
+    text = COMBINING_RE.sub('', unicodedata.normalize('NFKD', text)).lower()
+    return [stem(token) for token in TOKEN_RE.findall(text) if len(token) > 1 and token not in _STOPWORDS]
+
+
+def _markup_text(markup):
+    return html.unescape(TAG_RE.sub(' ', markup))
+
+
+def _growing_fields(info):
+    # (pests, other growing text) as shown on the crop page: the raw text when parsing found
+    # no sections, else the parsed sections
+    if info['culture'] == "N/A" and isinstance(info['full_text'], str):
+        return "", info['full_text'] if info['full_text'] != NO_INFO else ""
+    pests = _markup_text(info['pests']) if info['pests'] != "N/A" else ""
+    growing = " ".join(_markup_text(info[key]) for key in ("culture", "transplanting", "harvest") if info[key] != "N/A")
+    return pests, growing
+
+
+def _add_terms(scores, text, weight):
+    if isinstance(text, str):
+        for term in tokenize(text):
+            scores[term] = scores.get(term, 0) + weight
+
+
+def _cached_terms(cache, key, produce):
+    terms = cache.get(key)
+    if terms is None:
+        terms = cache[key] = {}
+        produce(terms)
+    return terms
+
+
+def document_terms(variety, cache):
+    # {term: weighted count} for one variety. Growing info, crop, resistance codes and latin
+    # names are shared by many varieties, so each distinct value is tokenized once.
+    info = variety["growing_info"]
+
+    def growing_terms(terms):
+        pests, text = _growing_fields(info)
+        _add_terms(terms, pests, FIELD_WEIGHTS["pests"])
+        _add_terms(terms, text, FIELD_WEIGHTS["growing"])
+
+    scores = dict(_cached_terms(cache, ("growing", info["full_text"]), growing_terms))
+    for field in ("crop", "resistance", "latin"):
+        value = variety[field]
+        if isinstance(value, str):
+            shared = _cached_terms(cache, (field, value), lambda terms: _add_terms(terms, value, FIELD_WEIGHTS[field]))
+            for term, weight in shared.items():
+                scores[term] = scores.get(term, 0) + weight
+    _add_terms(scores, variety["name"], FIELD_WEIGHTS["name"])
+    return scores
+
+
+def _split_shards(encoded, prefix=""):
+    # {prefix: [terms]}: terms grouped by their first character, and groups larger than
+    # SHARD_BYTES split again by the next character. Terms no longer than a split prefix stay
+    # in the shard of that prefix.
+    groups = {}
+    for term in encoded:
+        groups.setdefault(term[:len(prefix) + 1], []).append(term)
+    shards = {}
+    for key, members in groups.items():
+        if len(key) <= len(prefix):
+            shards.setdefault(prefix, []).extend(members)
+        elif len(key) < MAX_PREFIX and sum(len(encoded[term]) for term in members) > SHARD_BYTES:
+            for sub_key, sub_members in _split_shards({term: encoded[term] for term in members}, key).items():
+                shards.setdefault(sub_key, []).extend(sub_members)
+        else:
+            shards[key] = members
+    return shards
+
+
+def search_settings():
+    # Everything besides the catalog that the encoded index depends on
+    return {"format": FORMAT_VERSION, "stemmer": STEMMER, "stopwords": STOPWORDS, "weights": FIELD_WEIGHTS,
+            "shard_bytes": SHARD_BYTES, "max_prefix": MAX_PREFIX, "doc_block": DOC_BLOCK}
+
+
+def encode_search_index(varieties, crop_pages, cache=None):
+    # Inverted index over the varieties (in catalog order; doc ids are positions). `cache`
+    # keeps the terms of shared field values between calls. Returns (index, shards, doc blocks):
+    #   index: format, doc count, stemmer, stopwords, field weights, crops and page per crop,
+    #          shard prefixes and doc block size
+    #   shards: {prefix: JSON of {term: [doc, score, doc delta, score, ...]}}, docs ascending
+    #   doc blocks: [[name, crop number, anchor], ...] per DOC_BLOCK docs
+    crops = list(dict.fromkeys(variety["crop"] for variety in varieties))
+    crop_numbers = {crop: number for number, crop in enumerate(crops)}
+    postings = {}
+    cache = {} if cache is None else cache
+    docs = []
+    for doc, variety in enumerate(varieties):
+        for term, score in document_terms(variety, cache).items():
+            entry = postings.get(term)
+            if entry is None:
+                postings[term] = [doc, score]
+            else:
+                entry += doc, score
+        docs.append([variety["name"], crop_numbers[variety["crop"]], variety["anchor"]])
+
+    # Doc ids become deltas from the previous posting, which keeps the numbers short. Terms
+    # are [a-z0-9] and postings are integers, so they are serialized without json.
+    encoded = {}
+    for term, entry in postings.items():
+        for i in range(len(entry) - 2, 0, -2):
+            entry[i] -= entry[i - 2]
+        encoded[term] = f'"{term}":[{",".join(map(str, entry))}]'
+    shards = {prefix: "{" + ",".join(encoded[term] for term in sorted(terms)) + "}"
+              for prefix, terms in sorted(_split_shards(encoded).items())}
+
+    index = {
+        "format": FORMAT_VERSION,
+        "docs": len(docs),
+        "doc_block": DOC_BLOCK,
+        "stemmer": STEMMER,
+        "stopwords": STOPWORDS,
+        "weights": FIELD_WEIGHTS,
+        "crops": crops,
+        "pages": [crop_pages[crop] for crop in crops],
+        "shards": list(shards),
+    }
+    blocks = [docs[i:i + DOC_BLOCK] for i in range(0, len(docs), DOC_BLOCK)]
+    return index, shards, blocks
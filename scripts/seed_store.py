@@ -0,0 +1,169 @@
+import argparse
+import csv
+import os
+import sqlite3
+import time
+
+SCHEMA_VERSION = 1
+# CSV header (and record keys used by the scraper) -> column in the seeds table
+FIELDS = {
+    "Product Name": "product_name",
+    "Latin Name": "latin_name",
+    "Days to Maturity": "days_to_maturity",
+    "Life Cycle": "life_cycle",
+    "Hybrid Status": "hybrid_status",
+    "Disease Resistance": "disease_resistance",
+    "Growing Info": "growing_info",
+    "URL": "url",
+    "Image Path": "image_path",
+}
+COLUMNS = list(FIELDS)
+STORE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+MIGRATIONS = {
+    1: [
+        f"""CREATE TABLE seeds (
+            id INTEGER PRIMARY KEY,
+            {', '.join(f'{column} TEXT' for column in FIELDS.values() if column != 'url')},
+            url TEXT NOT NULL UNIQUE,
+            scraped_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )""",
+    ],
+}
+
+
+def is_store_path(path):
+    return path.lower().endswith(STORE_EXTENSIONS)
+
+
+def _db_value(value):
+    # Empty CSV cells and NaN are stored as NULL
+    if value is None or value == "" or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+
+class SeedStore:
+    # Scraped seed records keyed by product URL. Writes are upserts buffered into batches of
+    # batch_size rows, each committed as one transaction; flush() or close() commits the rest.
+    def __init__(self, path, batch_size=25):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = {}
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        columns = list(FIELDS.values())
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != 'url')
+        self._upsert_sql = (
+            f"INSERT INTO seeds ({', '.join(columns)}, scraped_at, updated_at) "
+            f"VALUES ({', '.join('?' * (len(columns) + 2))}) "
+            f"ON CONFLICT(url) DO UPDATE SET {updates}, updated_at = excluded.updated_at"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _migrate(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} has schema version {version}; this version of the scripts supports up to {SCHEMA_VERSION}")
+        with self.conn:
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                for statement in MIGRATIONS[target]:
+                    self.conn.execute(statement)
+                self.conn.execute(f"PRAGMA user_version = {target}")
+
+    def __len__(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM seeds").fetchone()[0]
+
+    def has(self, url):
+        if url in self._pending:
+            return True
+        return self.conn.execute("SELECT 1 FROM seeds WHERE url = ?", (url,)).fetchone() is not None
+
+    def upsert(self, record):
+        self._pending[record["URL"]] = record
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def upsert_many(self, records):
+        for record in records:
+            self.upsert(record)
+        self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        now = time.time()
+        params = [[_db_value(record.get(name)) for name in COLUMNS] + [now, now] for record in self._pending.values()]
+        with self.conn:
+            self.conn.executemany(self._upsert_sql, params)
+        self._pending.clear()
+
+    def rows(self):
+        # Records with CSV column names, in the order they were first scraped
+        self.flush()
+        query = f"SELECT {', '.join(FIELDS.values())} FROM seeds ORDER BY id"
+        for values in self.conn.execute(query):
+            yield dict(zip(COLUMNS, values))
+
+    def import_csv(self, csv_path):
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            records = [record for record in csv.DictReader(f) if record.get("URL")]
+        self.upsert_many(records)
+        return len(records)
+
+    def export_csv(self, csv_path):
+        tmp_path = f"{csv_path}.tmp"
+        directory = os.path.dirname(csv_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        count = 0
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS)
+            writer.writeheader()
+            for record in self.rows():
+                writer.writerow(record)
+                count += 1
+        os.replace(tmp_path, csv_path)
+        return count
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import or export the seed store as CSV.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('import', help='Upsert the rows of a CSV file into a store')
+    imp.add_argument('csv_path')
+    imp.add_argument('store_path')
+    exp = sub.add_parser('export', help='Write a store out as CSV')
+    exp.add_argument('store_path')
+    exp.add_argument('csv_path')
+    args = parser.parse_args()
+
+    with SeedStore(args.store_path) as store:
+        if args.command == 'import':
+            count = store.import_csv(args.csv_path)
+            print(f"Imported {count} rows from {args.csv_path}; {len(store)} seeds in {args.store_path}")
+        else:
+            count = store.export_csv(args.csv_path)
+            print(f"Exported {count} seeds to {args.csv_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import csv
+import importlib.util
+import re
+
+from seed_store import COLUMNS as SEED_COLUMNS, SeedStore, is_store_path
+
+# Strings pandas.read_csv treats as missing by default
+CSV_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                 '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+# "auto" is "csv": everything after the directives works on rows anyway, so skipping the
+# pandas import and the conversion to records wins at every catalog size measured (1k to 100k)
+ENGINES = ["auto", "csv", "pandas"]
+
+INT_RE = re.compile(r'[+-]?\d+')
+FLOAT_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|[+-]?(?:inf|Inf|INF|infinity|Infinity)')
+_NA_VALUES = frozenset(CSV_NA_VALUES)
+NAN = float('nan')
+
+
+class SeedRecords(list):
+    # The stdlib stand-in for a catalog DataFrame: one dict per row, values converted like
+    # read_csv converts them, and the column names in file order
+    def __init__(self, rows=(), columns=None):
+        super().__init__(rows)
+        self.columns = list(columns) if columns is not None else list(self[0]) if self else []
+
+
+def pandas_available():
+    return importlib.util.find_spec("pandas") is not None
+
+
+def is_frame(table):
+    # Without importing pandas to check
+    return hasattr(table, 'iloc')
+
+
+def resolve_engine(engine):
+    if engine == "pandas" and not pandas_available():
+        raise ValueError("engine 'pandas' needs pandas, which is not installed")
+    return "pandas" if engine == "pandas" else "csv"
+
+
+def _convert_column(values):
+    # read_csv's missing values and numeric inference for one column: all integers become int
+    # (float when some are missing), all numbers become float, anything else stays text
+    values = [NAN if value is None or value != value or value in _NA_VALUES else value for value in values]
+    present = [value for value in values if isinstance(value, str)]
+    if not present:
+        return values
+    if all(INT_RE.fullmatch(value) for value in present):
+        convert = int if len(present) == len(values) else float
+    elif all(FLOAT_RE.fullmatch(value) for value in present):
+        convert = float
+    else:
+        return values
+    return [convert(value) if isinstance(value, str) else value for value in values]
+
+
+def seed_records(rows, columns=SEED_COLUMNS):
+    # SeedRecords from dicts of text (csv.DictReader, SeedStore.rows() or fresh scraper records)
+    rows = list(rows)
+    converted = [_convert_column([row.get(column) for row in rows]) for column in columns]
+    return SeedRecords((dict(zip(columns, values)) for values in zip(*converted)), columns)
+
+
+def seeds_frame(records):
+    # DataFrame of seed records, converted the same way as seed_records()
+    import pandas as pd
+    df = pd.DataFrame(list(records), columns=SEED_COLUMNS)
+    df = df.mask(df.isin(CSV_NA_VALUES) | df.isna(), NAN)
+    for column in df.columns:
+        try:
+            df[column] = pd.to_numeric(df[column])
+        except (ValueError, TypeError):
+            pass
+    return df
+
+
+def read_csv_records(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        columns = reader.fieldnames or []
+    return seed_records(rows, columns)
+
+
+def read_table(path, engine="auto"):
+    # The catalog in a CSV file or seed store, as a DataFrame or as SeedRecords (see
+    # resolve_engine). Both render the same site.
+    engine = resolve_engine(engine)
+    if is_store_path(path):
+        with SeedStore(path) as store:
+            rows = store.rows()
+            return seeds_frame(rows) if engine == "pandas" else seed_records(rows)
+    if engine == "pandas":
+        import pandas as pd
+        return pd.read_csv(path, encoding='utf-8')
+    return read_csv_records(path)
+
+
+def to_table(records, engine="auto"):
+    # A DataFrame or SeedRecords for records already in memory; DataFrames are kept as they are
+    if is_frame(records):
+        return records
+    records = list(records)
+    if resolve_engine(engine) == "pandas":
+        return seeds_frame(records)
+    return seed_records(records)
+
+
+def table_columns(table):
+    return list(table.columns)
+
+
+def table_column(table, name):
+    # The values of one column, or an empty list when the table does not have it
+    if name not in table.columns:
+        return []
+    return table[name] if is_frame(table) else [row[name] for row in table]
+
+
+def _row_key(values):
+    return tuple(None if value != value else value for value in values)
+
+
+def same_table(a, b):
+    # True when both hold the same columns and values (NaN equal to NaN)
+    if a is None or b is None or is_frame(a) != is_frame(b):
+        return False
+    if is_frame(a):
+        return a.equals(b)
+    return (a.columns == b.columns and len(a) == len(b)
+            and all(_row_key(x.values()) == _row_key(y.values()) for x, y in zip(a, b)))
@@ -0,0 +1,227 @@
+import argparse
+import datetime
+import json
+
+FORMAT_VERSION = 1
+TASKS = ["start_indoors", "transplant", "direct_sow", "harvest"]
+TASK_LABELS = {"start_indoors": "Start indoors", "transplant": "Transplant", "direct_sow": "Direct sow", "harvest": "Harvest"}
+# SortDTM of varieties without a days-to-maturity figure; they get no harvest task
+UNKNOWN_DTM = 999
+ICS_LINE_OCTETS = 75
+
+
+def _week_zero(year):
+    # Weeks are numbered from the Monday on or before Jan 1, so week boundaries are Mondays
+    base = datetime.date(year, 1, 1)
+    return base - datetime.timedelta(days=base.weekday())
+
+
+def schedule_tasks(rows):
+    # (task, row position, first day, last day) for each schedule row: the indoor start and
+    # transplant windows, or the direct sowing window, then the harvest window. Days to
+    # maturity count from transplanting for transplanted crops and from sowing otherwise.
+    for position, row in enumerate(rows):
+        if row["Method"] == "Start Indoors":
+            yield "start_indoors", position, row["Start"], row["StartEnd"]
+            yield "transplant", position, row["Transplant"], row["TransplantEnd"]
+            planted, planted_end = row["Transplant"], row["TransplantEnd"]
+        else:
+            yield "direct_sow", position, row["Start"], row["StartEnd"]
+            planted, planted_end = row["Start"], row["StartEnd"]
+        if row["SortDTM"] != UNKNOWN_DTM:
+            dtm = datetime.timedelta(days=row["SortDTM"])
+            yield "harvest", position, planted + dtm, planted_end + dtm
+
+
+def encode_task_index(rows, year):
+    # Task index for the schedule rows of one profile:
+    #   crops: [crop, page] and varieties: [name, crop number, anchor], each stored once
+    #   events: [task number, variety number, first day, last day], days counted from Jan 1
+    #           of `year` (as in the schedule data), sorted by first day
+    #   week_starts: position in events of the first event starting in each week from
+    #                first_week on (weeks counted from the Monday on or before Jan 1), plus
+    #                the end of events
+    #   max_days: the longest event, so a range query knows how far back to look
+    # An event overlapping [a, b] starts in [a - max_days, b], which is one slice of events.
+    base = datetime.date(year, 1, 1)
+    week_zero_offset = (base - _week_zero(year)).days
+    task_codes = {task: code for code, task in enumerate(TASKS)}
+    crops = {}
+    varieties = []
+    for row in rows:
+        crop = crops.setdefault(row["Crop"], (len(crops), row["Page"]))[0]
+        varieties.append([row["Variety"], crop, row["Anchor"]])
+
+    events = [[task_codes[task], position, (start - base).days, (end - base).days]
+              for task, position, start, end in schedule_tasks(rows)]
+    events.sort(key=lambda event: (event[2], event[3], event[0], event[1]))
+
+    def week(day):
+        return (day + week_zero_offset) // 7
+
+    first_week = week(events[0][2]) if events else 0
+    week_starts = []
+    for position, event in enumerate(events):
+        while first_week + len(week_starts) <= week(event[2]):
+            week_starts.append(position)
+    week_starts.append(len(events))
+    return {
+        "format": FORMAT_VERSION,
+        "year": year,
+        "tasks": TASKS,
+        "crops": [[crop, page] for crop, (_, page) in crops.items()],
+        "varieties": varieties,
+        "first_week": first_week,
+        "week_starts": week_starts,
+        "max_days": max((end - start for _, _, start, end in events), default=0),
+        "events": events,
+    }
+
+
+class TaskIndex:
+    # Date-range queries over an encoded task index. A query reads only the weeks it covers
+    # (plus max_days before), never the whole catalog.
+    def __init__(self, data):
+        if data.get("format") != FORMAT_VERSION:
+            raise ValueError(f"unsupported task index format {data.get('format')}")
+        self.data = data
+        self.base = datetime.date(data["year"], 1, 1)
+        self._week_zero_offset = (self.base - _week_zero(data["year"])).days
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _slice_start(self, day):
+        # Position in events of the first event starting in the week of `day`
+        week = (day + self._week_zero_offset) // 7 - self.data["first_week"]
+        starts = self.data["week_starts"]
+        return starts[min(max(week, 0), len(starts) - 1)]
+
+    def between(self, start, end, tasks=None):
+        # Tasks overlapping the dates start..end (inclusive), by first day. `tasks` limits
+        # them to some of TASKS.
+        first, last = (start - self.base).days, (end - self.base).days
+        wanted = None if tasks is None else {TASKS.index(task) for task in tasks}
+        events = self.data["events"]
+        found = []
+        for position in range(self._slice_start(first - self.data["max_days"]), self._slice_start(last + 7)):
+            task, variety, event_start, event_end = events[position]
+            if event_start > last:
+                break
+            if event_end >= first and (wanted is None or task in wanted):
+                found.append(self._task(task, variety, event_start, event_end))
+        return found
+
+    def all(self):
+        return [self._task(*event) for event in self.data["events"]]
+
+    def week(self, date, tasks=None):
+        # Tasks in the Monday-to-Sunday week containing `date`
+        monday = date - datetime.timedelta(days=date.weekday())
+        return self.between(monday, monday + datetime.timedelta(days=6), tasks)
+
+    def _task(self, task, variety, start, end):
+        name, crop, anchor = self.data["varieties"][variety]
+        crop_name, page = self.data["crops"][crop]
+        return {
+            "task": TASKS[task],
+            "label": TASK_LABELS[TASKS[task]],
+            "variety": name,
+            "crop": crop_name,
+            "page": f"{page}#{anchor}",
+            "start": self.base + datetime.timedelta(days=start),
+            "end": self.base + datetime.timedelta(days=end),
+        }
+
+
+def _ics_text(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _ics_fold(line):
+    # Content lines longer than 75 octets continue on lines starting with a space, never
+    # splitting a UTF-8 sequence
+    if len(line) <= ICS_LINE_OCTETS and line.isascii():
+        return [line]
+    data = line.encode('utf-8')
+    if len(data) <= ICS_LINE_OCTETS:
+        return [line]
+    parts = []
+    while data:
+        limit = ICS_LINE_OCTETS if not parts else ICS_LINE_OCTETS - 1
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(("" if not parts else " ") + data[:cut].decode('utf-8'))
+        data = data[cut:]
+    return parts
+
+
+def tasks_ics(tasks, name, year, site_url=""):
+    # iCalendar (RFC 5545) text with one all-day event per task. UIDs and DTSTAMP depend only
+    # on the task, so an unchanged schedule produces an identical file and calendar apps do
+    # not see edits that did not happen.
+    stamp = f"{year:04d}0101T000000Z"
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//garden-schedule//task index//EN", "CALSCALE:GREGORIAN",
+             f"X-WR-CALNAME:{_ics_text(name)}"]
+    seen = {}
+    days = {}
+
+    def day(date):
+        # Tasks share few distinct dates; strftime is the slow part of each event
+        text = days.get(date)
+        if text is None:
+            text = days[date] = f"{date:%Y%m%d}"
+        return text
+
+    for task in tasks:
+        start, end = day(task['start']), day(task['end'] + datetime.timedelta(days=1))
+        uid = f"{task['task']}-{task['page']}-{start}".replace('/', '-').replace('#', '-')
+        # A catalog can list the same variety twice
+        seen[uid] = seen.get(uid, 0) + 1
+        if seen[uid] > 1:
+            uid += f"-{seen[uid]}"
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@garden-schedule",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{start}",
+            # DTEND is exclusive for all-day events
+            f"DTEND;VALUE=DATE:{end}",
+            f"SUMMARY:{_ics_text(task['label'] + ': ' + task['variety'])}",
+            f"CATEGORIES:{_ics_text(task['crop'])}",
+        ]
+        if site_url:
+            lines.append(f"URL:{site_url.rstrip('/')}/{task['page']}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "".join(folded + "\r\n" for line in lines for folded in _ics_fold(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List garden tasks (start indoors, transplant, direct sow, harvest) for a date range.')
+    parser.add_argument('index', nargs='?', default='site/tasks.json', help='Task index written by generate_garden_data.py (default: site/tasks.json)')
+    parser.add_argument('--date', type=datetime.date.fromisoformat, default=datetime.date.today(), help='First day, YYYY-MM-DD (default: today)')
+    parser.add_argument('--days', type=int, default=7, help='Number of days from --date (default: 7)')
+    parser.add_argument('--task', action='append', choices=TASKS, help='Only these tasks (repeatable)')
+    parser.add_argument('--ics', metavar='FILE', help='Write the tasks to an iCalendar file instead of listing them')
+    parser.add_argument('--site-url', default='', help='Base URL of the published site, to link each calendar event to its growing guide')
+    args = parser.parse_args()
+
+    index = TaskIndex.load(args.index)
+    end = args.date + datetime.timedelta(days=max(1, args.days) - 1)
+    tasks = index.between(args.date, end, args.task)
+    if args.ics:
+        with open(args.ics, 'w', encoding='utf-8', newline='') as f:
+            f.write(tasks_ics(tasks, f"Garden tasks {args.date} - {end}", index.data["year"], args.site_url))
+        print(f"Wrote {len(tasks)} tasks to {args.ics}")
+        return
+    print(f"{len(tasks)} tasks from {args.date:%b %d} to {end:%b %d}:")
+    for task in tasks:
+        print(f"  {task['start']:%b %d} - {task['end']:%b %d}  {task['label']:<14} {task['variety']} ({task['crop']})")
+
+
+if __name__ == '__main__':
+    main()
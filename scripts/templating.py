@@ -0,0 +1,164 @@
+import ast
+import builtins
+import functools
+import hashlib
+import html
+import os
+import re
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# {{ expr }} / {{ expr|safe }} output, {% if/elif/else/endif %}, {% for x in expr %}...{% endfor %},
+# {# comment #}. Expressions are plain Python evaluated against the render context; escaped
+# output expressions must be hashable (strings, numbers, dates).
+TOKEN_RE = re.compile(r'\{\{(.*?)\}\}|\{%(.*?)%\}|\{#.*?#\}', re.S)
+SPECIAL_CHARS_RE = re.compile(r'[&<>"\']')
+
+
+class TemplateError(Exception):
+    pass
+
+
+def escape(value):
+    text = str(value)
+    if SPECIAL_CHARS_RE.search(text) is None:
+        return text
+    return html.escape(text)
+
+
+class _EscapeCache(dict):
+    # Catalog values repeat a lot (life cycle, hybrid status, date ranges), so each distinct
+    # value is escaped once per render call and later lookups stay in C
+    def __missing__(self, value):
+        escaped = self[value] = escape(value)
+        return escaped
+
+
+def _free_names(expr, bound):
+    names = set()
+    for node in ast.walk(ast.parse(expr, mode='eval')):
+        if isinstance(node, ast.Name) and node.id not in bound and not hasattr(builtins, node.id):
+            names.add(node.id)
+    return names
+
+
+def _target_names(target):
+    return {node.id for node in ast.walk(ast.parse(target, mode='eval')) if isinstance(node, ast.Name)}
+
+
+def _line_statement(source, start, end):
+    # A block tag or comment alone on its line takes the whole line with it, so templates can put
+    # control flow on separate lines without leaving blank lines in the output
+    line_start = source.rfind('\n', 0, start) + 1
+    if source[line_start:start].strip() or not source.startswith('\n', end):
+        return start, end
+    return line_start, end + 1
+
+
+class Template:
+    # Compiles template source into a Python function once. Rendering calls write() with
+    # consecutive chunks, so output can go straight to a (buffered) file.
+    def __init__(self, source, name='<template>'):
+        self.name = name
+        self.source = source[:-1] if source.endswith('\n') else source
+        self.digest = hashlib.sha256(self.source.encode('utf-8')).hexdigest()
+        self._render = self._compile()
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read(), name=os.path.basename(path))
+
+    def stream(self, write, **context):
+        self._render(context, write, _EscapeCache())
+
+    def render(self, **context):
+        chunks = []
+        self._render(context, chunks.append, _EscapeCache())
+        return ''.join(chunks)
+
+    def _compile(self):
+        source = self.source
+        lines = []
+        stack = []
+        bound = set()
+        free = set()
+        pending = []
+        pos = 0
+
+        def emit(code):
+            lines.append('    ' * (len(stack) + 1) + code)
+
+        def flush():
+            # Each run of text and expressions between block tags becomes a single write
+            if len(pending) == 1:
+                emit(f"_write({pending[0]})")
+            elif pending:
+                emit(f"_write(''.join(({', '.join(pending)})))")
+            pending.clear()
+
+        for match in TOKEN_RE.finditer(source):
+            start, end = match.span()
+            if match.group(1) is None:
+                start, end = _line_statement(source, start, end)
+            if start > pos:
+                pending.append(repr(source[pos:start]))
+            pos = end
+
+            if match.group(1) is not None:
+                expr = match.group(1).strip()
+                raw = expr.endswith('|safe')
+                if raw:
+                    expr = expr[:-len('|safe')].strip()
+                free |= _free_names(expr, bound)
+                pending.append(f"str({expr})" if raw else f"_escape[{expr}]")
+            elif match.group(2) is not None:
+                words = match.group(2).strip()
+                keyword, _, rest = words.partition(' ')
+                rest = rest.strip()
+                flush()
+                if keyword == 'if':
+                    free |= _free_names(rest, bound)
+                    emit(f"if {rest}:")
+                    stack.append('if')
+                elif keyword in ('elif', 'else'):
+                    if not stack or stack[-1] != 'if':
+                        raise TemplateError(f"{self.name}: '{keyword}' outside of an if block")
+                    if lines[-1].rstrip().endswith(':'):
+                        emit("pass")
+                    if keyword == 'elif':
+                        free |= _free_names(rest, bound)
+                    lines.append('    ' * len(stack) + (f"elif {rest}:" if keyword == 'elif' else "else:"))
+                elif keyword == 'for':
+                    target, sep, iterable = rest.partition(' in ')
+                    if not sep:
+                        raise TemplateError(f"{self.name}: malformed for tag '{words}'")
+                    free |= _free_names(iterable, bound)
+                    bound |= _target_names(target)
+                    emit(f"for {target} in {iterable}:")
+                    stack.append('for')
+                elif keyword in ('endif', 'endfor'):
+                    if not stack or stack[-1] != keyword[3:]:
+                        raise TemplateError(f"{self.name}: unexpected '{keyword}'")
+                    if lines[-1].rstrip().endswith(':'):
+                        emit("pass")
+                    stack.pop()
+                else:
+                    raise TemplateError(f"{self.name}: unknown tag '{keyword}'")
+
+        if stack:
+            raise TemplateError(f"{self.name}: unclosed '{stack[-1]}' block")
+        if pos < len(source):
+            pending.append(repr(source[pos:]))
+        flush()
+
+        prologue = [f"    {name} = _ctx[{name!r}]" for name in sorted(free - bound)]
+        code = "\n".join(["def _render(_ctx, _write, _escape):"] + prologue + (lines or ["    pass"]))
+        namespace = {}
+        exec(compile(code, self.name, 'exec'), namespace)
+        return namespace['_render']
+
+
+@functools.lru_cache(maxsize=None)
+def load_template(name):
+    return Template.from_file(os.path.join(TEMPLATE_DIR, name))
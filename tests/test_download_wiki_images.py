@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from download_wiki_images import SearchCache, download_batch
+from http_client import HttpClient
+
+JPEG = b'\xff\xd8\xff\xe0' + b'\0' * 60
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 60
+# Search term -> files (path on the fixture server, in search order)
+RESULTS = {
+    "Solanum lycopersicum": ["/files/tomato.svg", "/files/tomato.jpg"],
+    "Cucurbita pepo": ["/files/squash.png"],
+    "Nothing here": [],
+}
+FILES = {"/files/tomato.jpg": JPEG, "/files/squash.png": PNG, "/files/tomato.svg": b"<svg/>"}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # A fake MediaWiki api.php answering generator=search queries, plus the files it points to
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.requests.append(url.path)
+        if url.path == "/w/api.php":
+            term = parse_qs(url.query)["gsrsearch"][0]
+            base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            # Page ids in reverse, so results are only in order when sorted by "index"
+            pages = {str(100 - n): {"index": n + 1, "imageinfo": [{"url": base + path}]}
+                     for n, path in enumerate(RESULTS.get(term, []))}
+            self._send(200, json.dumps({"query": {"pages": pages}} if pages else {}).encode('utf-8'), "application/json")
+        elif url.path in FILES:
+            self._send(200, FILES[url.path], "application/octet-stream")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DownloadBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api_url = f"http://127.0.0.1:{self.server.server_address[1]}/w/api.php"
+        self.work_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.work_dir, "cache", "wiki_search.json")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.work_dir)
+
+    def output(self, name):
+        return os.path.join(self.work_dir, "images", name)
+
+    def run_batch(self, jobs):
+        client = HttpClient(retries=0)
+        # Talk to the fixture server directly, whatever proxy the environment sets
+        client.session.trust_env = False
+        cache = SearchCache(self.cache_path)
+        try:
+            results = download_batch(jobs, client, cache, self.api_url, workers=2)
+        finally:
+            cache.save()
+            client.close()
+        return results, cache
+
+    def api_requests(self):
+        return self.server.requests.count("/w/api.php")
+
+    def test_downloads_skips_and_reuses_searches(self):
+        existing = self.output("basil.jpg")
+        os.makedirs(os.path.dirname(existing))
+        with open(existing, 'wb') as f:
+            f.write(JPEG)
+        jobs = [
+            ("Solanum lycopersicum", self.output("tomato.jpg")),
+            ("Cucurbita pepo", self.output("squash.png")),
+            ("Nothing here", self.output("nothing.jpg")),
+            ("Ocimum basilicum", existing),
+        ]
+
+        results, cache = self.run_batch(jobs)
+        self.assertEqual(results, {
+            self.output("tomato.jpg"): "downloaded",
+            self.output("squash.png"): "downloaded",
+            self.output("nothing.jpg"): "not found",
+            existing: "skipped",
+        })
+        # The first result is an SVG, so the JPEG after it is taken
+        with open(self.output("tomato.jpg"), 'rb') as f:
+            self.assertEqual(f.read(), JPEG)
+        with open(self.output("squash.png"), 'rb') as f:
+            self.assertEqual(f.read(), PNG)
+        self.assertFalse(os.path.exists(self.output("nothing.jpg")))
+        # A valid existing output is neither searched for nor downloaded
+        self.assertEqual(self.api_requests(), 3)
+        self.assertEqual(cache.hits, 0)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        # Second run: valid outputs are skipped, and the output that went missing is found
+        # from the saved search cache without asking the API again
+        os.remove(self.output("tomato.jpg"))
+        results, cache = self.run_batch(jobs)
+        self.assertEqual(results[self.output("tomato.jpg")], "downloaded")
+        self.assertEqual(results[self.output("squash.png")], "skipped")
+        self.assertEqual(results[existing], "skipped")
+        self.assertEqual(results[self.output("nothing.jpg")], "not found")
+        self.assertEqual(self.api_requests(), 3)
+        self.assertEqual(cache.hits, 2)
+        with open(self.output("tomato.jpg"), 'rb') as f:
+            self.assertEqual(f.read(), JPEG)
+
+    def test_invalid_output_is_downloaded_again(self):
+        output = self.output("tomato.jpg")
+        os.makedirs(os.path.dirname(output))
+        with open(output, 'wb') as f:
+            f.write(b"<html>error page</html>")
+        results, _ = self.run_batch([("Solanum lycopersicum", output)])
+        self.assertEqual(results, {output: "downloaded"})
+        with open(output, 'rb') as f:
+            self.assertEqual(f.read(), JPEG)
+
+    def test_command_line_batch_uses_api_url(self):
+        batch = os.path.join(self.work_dir, "batch.json")
+        with open(batch, 'w', encoding='utf-8') as f:
+            json.dump({"images": [{"search": "Cucurbita pepo", "output": self.output("squash.png")}]}, f)
+        env = dict(os.environ, NO_PROXY="127.0.0.1", no_proxy="127.0.0.1")
+        outputs = []
+        for _ in range(2):
+            completed = subprocess.run(
+                [sys.executable, os.path.join(ROOT, 'scripts', 'download_wiki_images.py'), '--batch', batch,
+                 '--api-url', self.api_url, '--search-cache', self.cache_path, '--rate', '100', '--burst', '100'],
+                cwd=self.work_dir, env=env, capture_output=True, text=True)
+            self.assertEqual(completed.returncode, 0, completed.stdout + completed.stderr)
+            outputs.append(completed.stdout)
+        self.assertIn("1 downloaded, 0 skipped", outputs[0])
+        self.assertIn("0 downloaded, 1 skipped", outputs[1])
+        with open(self.output("squash.png"), 'rb') as f:
+            self.assertEqual(f.read(), PNG)
+        self.assertEqual(self.api_requests(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
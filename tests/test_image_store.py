@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+from image_store import ImageStore
+
+JPEG = b'\xff\xd8\xff\xe0' + b'\0' * 60
+
+
+class SlowClient:
+    # Stands in for HttpClient.download: counts downloads per URL and takes long enough that
+    # concurrent callers overlap
+    def __init__(self, status=200, error=None):
+        self.status = status
+        self.error = error
+        self.downloads = {}
+        self._lock = threading.Lock()
+
+    def download(self, url, filepath, chunk_size=None):
+        with self._lock:
+            self.downloads[url] = self.downloads.get(url, 0) + 1
+        time.sleep(0.2)
+        if self.error is not None:
+            raise self.error
+        if self.status == 200:
+            with open(filepath, 'wb') as f:
+                f.write(JPEG + url.encode('utf-8'))
+        return self.status
+
+
+class ImageStoreFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def fetch_concurrently(self, store, client, urls):
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            return list(executor.map(lambda url: store.fetch(url, client), urls))
+
+    def test_concurrent_fetches_of_one_url_download_it_once(self):
+        store = ImageStore(self.directory)
+        client = SlowClient()
+        url = "http://images.example/seed.jpg"
+        results = self.fetch_concurrently(store, client, [url] * 4 + ["http://images.example/other.jpg"])
+        self.assertEqual(client.downloads, {url: 1, "http://images.example/other.jpg": 1})
+        self.assertEqual(len(set(results[:4])), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, os.path.basename(results[0]))))
+        # Later calls are answered from sources.json without downloading
+        self.assertEqual(store.fetch(url, client), results[0])
+        self.assertEqual(client.downloads[url], 1)
+
+    def test_failed_download_is_shared_then_retried(self):
+        store = ImageStore(self.directory)
+        client = SlowClient(status=404)
+        url = "http://images.example/missing.jpg"
+        self.assertEqual(self.fetch_concurrently(store, client, [url] * 3), [None] * 3)
+        self.assertEqual(client.downloads[url], 1)
+        client.status = 200
+        self.assertIsNotNone(store.fetch(url, client))
+        self.assertEqual(client.downloads[url], 2)
+
+    def test_download_error_reaches_every_waiter(self):
+        store = ImageStore(self.directory)
+        client = SlowClient(error=ConnectionError("reset"))
+        url = "http://images.example/reset.jpg"
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(store.fetch, url, client) for _ in range(3)]
+            for future in futures:
+                self.assertRaises(ConnectionError, future.result)
+        self.assertEqual(client.downloads[url], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, 'scripts')
+
+
+class ProfileExitTest(unittest.TestCase):
+    # --profile writes its report however the run ends, including the early returns for bad input
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.report = os.path.join(self.work_dir, "profile.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir)
+
+    def run_script(self, script, *args):
+        completed = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS, script), *args, '--profile', self.report],
+            cwd=self.work_dir, capture_output=True, text=True)
+        self.assertEqual(completed.returncode, 0, completed.stdout + completed.stderr)
+        with open(self.report, 'r', encoding='utf-8') as f:
+            json.load(f)
+        return completed.stdout
+
+    def test_scraper_missing_input(self):
+        output = self.run_script('scrape_johnnys_seeds.py', 'missing-orders')
+        self.assertIn("not found", output)
+
+    def test_scraper_no_history_files(self):
+        os.mkdir(os.path.join(self.work_dir, "orders"))
+        output = self.run_script('scrape_johnnys_seeds.py', 'orders')
+        self.assertIn("No HTML files found", output)
+
+    def test_generator_missing_input(self):
+        output = self.run_script('generate_garden_data.py', 'missing.csv')
+        self.assertIn("not found", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Dependencies the CLI scripts only import once a run needs them
+HEAVY_MODULES = ("pandas", "numpy", "bs4", "PIL")
+
+
+def imported_modules(module):
+    # Every module `import <module>` loads in a fresh interpreter, from python -X importtime
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=os.path.join(ROOT, 'scripts'),
+                            check=True, capture_output=True, text=True).stderr
+    return {line.rsplit('|', 1)[1].strip() for line in output.splitlines() if line.startswith('import time:')}
+
+
+class StartupImportTest(unittest.TestCase):
+    def assert_no_heavy_imports(self, module):
+        modules = imported_modules(module)
+        self.assertIn(module, modules)
+        heavy = sorted({name.split('.')[0] for name in modules} & set(HEAVY_MODULES))
+        self.assertEqual(heavy, [], f"importing {module} loads {', '.join(heavy)}")
+
+    def test_generate_garden_data(self):
+        self.assert_no_heavy_imports('generate_garden_data')
+
+    def test_scrape_johnnys_seeds(self):
+        self.assert_no_heavy_imports('scrape_johnnys_seeds')
+
+
+if __name__ == '__main__':
+    unittest.main()